@@ -8,18 +8,24 @@ Config-driven:
   - All LLM prompts  : config/prompts/*.txt
   - Output fields    : config['prompts']['score_job']['output_fields']
   - Embed model      : config['models']['embed_model']  (switchable via sidebar)
+  - Prefetch         : config['prefetch']  (match work starts on upload, see src/prefetch.py)
+  - Profiling        : sidebar debug toggle or MATCHER_PROFILE=1 (see src/profiling.py)
 """
 import os
 import json
-import tempfile
 from pathlib import Path
 
 import streamlit as st
 from together import Together
 
-from src.config import get_role_names, get_limits, get_models, get_prompt_fields, get_prompt_version
-from src.match_jobs import load_faiss_index, match_resume_to_jobs
-from src.score_explain import score_top_jobs
+from src.config import (get_role_names, get_limits, get_models, get_prompt_fields, get_prompt_version,
+                        get_cascade_config, get_prefetch_config, get_together_base_url)
+from src.match_jobs import load_faiss_index
+from src.session_results import get_result_session
+from src.prefetch import start_prefetch, adopt_prefetch, discard_prefetch
+from src.profiling import ProfileRun, profile_stage, profiling_enabled
+from src.resume_cache import get_resume_text
+from src.embedder import is_local_model
 from src.model_search import get_available_embedding_models, set_embed_model, get_current_embed_model
 
 # ── Page config ───────────────────────────────────────────────────────────────
@@ -78,6 +84,17 @@ def get_index():
     return load_faiss_index()
 
 
+def clear_cached_resources():
+    """st.cache_resource.clear() drops the index without closing it: stop its shard workers first."""
+    try:
+        close = getattr(get_index()[0], "close", None)
+    except Exception:
+        close = None   # index never loaded: nothing to stop
+    if close is not None:
+        close()
+    st.cache_resource.clear()
+
+
 @st.cache_resource(show_spinner="Connecting to Together.ai...")
 def get_client():
     api_key = os.environ.get("TOGETHER_API_KEY", "")
@@ -87,26 +104,20 @@ def get_client():
             "Add it as an environment variable or Streamlit secret."
         )
         st.stop()
-    return Together(api_key=api_key)
+    return Together(api_key=api_key, base_url=get_together_base_url())
 
 
 def extract_text_from_upload(uploaded_file) -> str:
     suffix = Path(uploaded_file.name).suffix.lower()
-    if suffix == ".txt":
-        return uploaded_file.read().decode("utf-8", errors="replace")
-    if suffix == ".pdf":
-        try:
-            from pypdf import PdfReader
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                tmp.write(uploaded_file.read())
-                tmp_path = tmp.name
-            reader = PdfReader(tmp_path)
-            return "\n".join(p.extract_text() or "" for p in reader.pages)
-        except ImportError:
-            st.error("pypdf is required. Run: pip install pypdf")
-            st.stop()
-    st.error(f"Unsupported file type: {suffix}. Upload a .pdf or .txt file.")
-    st.stop()
+    if suffix not in (".pdf", ".txt"):
+        st.error(f"Unsupported file type: {suffix}. Upload a .pdf or .txt file.")
+        st.stop()
+    try:
+        # Cached by content hash — re-runs on the same file skip parsing
+        return get_resume_text(uploaded_file.getvalue(), suffix)
+    except ImportError:
+        st.error("pypdf is required. Run: pip install pypdf")
+        st.stop()
 
 
 def score_color_class(score: int) -> str:
@@ -207,7 +218,7 @@ with st.sidebar:
                     "Re-run `python src/embed_jobs.py` and "
                     "`python src/build_faiss_index.py` to rebuild the index."
                 )
-                st.cache_resource.clear()
+                clear_cached_resources()
                 st.rerun()
             except Exception as e:
                 st.error(f"Failed to update config: {e}")
@@ -223,11 +234,20 @@ with st.sidebar:
                     "Switched to local model. "
                     "Re-run embed_jobs.py and build_faiss_index.py to rebuild the index."
                 )
-                st.cache_resource.clear()
+                clear_cached_resources()
                 st.rerun()
             except Exception as e:
                 st.error(f"Failed: {e}")
 
+    st.divider()
+
+    # ── Debug ──────────────────────────────────────────────────────────────
+    profile_request = st.toggle(
+        "🔬 Profile requests",
+        value=False,
+        help="CPU + memory profile of matching and scoring; hottest functions shown below the results.",
+    )
+
 
 # ── Main UI ───────────────────────────────────────────────────────────────────
 st.title("🎯 Resume Job Matcher")
@@ -244,7 +264,33 @@ uploaded = st.file_uploader(
 
 run_btn = st.button("🚀 Find My Best Jobs", type="primary", disabled=uploaded is None)
 
+# ── Speculative prefetch: extract, embed, retrieve (and score #1) before the click
+prefetch_cfg = get_prefetch_config()
+if uploaded is None:
+    discard_prefetch(st.session_state)
+elif prefetch_cfg.get("enabled") and Path(uploaded.name).suffix.lower() in (".pdf", ".txt"):
+    try:
+        pf_index, pf_meta, pf_clean = get_index()
+    except FileNotFoundError:
+        pf_index = None
+    # Never prompt for the API key here; without one the prefetch stays local-only
+    pf_client   = get_client() if os.environ.get("TOGETHER_API_KEY") else None
+    local_embed = is_local_model(get_models()["embed_model"])
+    if pf_index is not None and (local_embed or pf_client is not None):
+        # Cascade decides itself which jobs reach the LLM, so only pre-score #1 without it
+        score_top1 = prefetch_cfg.get("score_top1") and not get_cascade_config().get("enabled")
+        start_prefetch(
+            st.session_state, uploaded.getvalue(), Path(uploaded.name).suffix.lower(), preferred_role,
+            top_k, pf_index, pf_meta, pf_clean,
+            embed_client=None if local_embed else pf_client,
+            score_client=pf_client if score_top1 else None,
+        )
+
 if run_btn and uploaded:
+    # Hand any finished speculative work to this run (no-op if none or stale)
+    with st.spinner("Finishing prefetched work..."):
+        prefetched = adopt_prefetch(st.session_state, timeout=float(prefetch_cfg.get("wait_seconds", 60)))
+
     resume_text = extract_text_from_upload(uploaded)
 
     if len(resume_text.strip()) < 100:
@@ -268,24 +314,35 @@ if run_btn and uploaded:
         )
         st.stop()
 
+    # Local embed models don't need the Together client
+    embed_model = get_models()["embed_model"]
+    client_for_embed = None if is_local_model(embed_model) else client
+    # Per-session state: slider changes only search/score the jobs that are new
+    session = get_result_session(
+        st.session_state, resume_text, preferred_role, index, meta, clean_jobs, client_for_embed,
+    )
+
+    # One profile directory per request when the debug toggle (or MATCHER_PROFILE) is on
+    profile_run = ProfileRun("app") if (profile_request or profiling_enabled()) else None
+
     with st.spinner(f"Retrieving top {top_k} matches for **{preferred_role}**..."):
-        # Local embed models don't need the Together client
-        embed_model = get_models()["embed_model"]
-        client_for_embed = None if embed_model.startswith("local:") else client
-        matches = match_resume_to_jobs(
-            resume_text, index, meta, clean_jobs, client_for_embed,
-            preferred_role=preferred_role,
-            top_k=top_k,
-        )
+        with profile_stage("match", profile_run):
+            matches = session.matches(top_k)
 
     if not matches:
         st.warning("No matches found. Try selecting 'Any' role or re-fetching jobs.")
         st.stop()
 
     with st.spinner(f"Scoring top {top_n} matches with LLM..."):
-        scored = score_top_jobs(resume_text, matches, client, top_n=top_n)
+        # Cascade mode only sends confident/uncertain candidates to the LLM
+        with profile_stage("score", profile_run):
+            scored = session.score(matches, top_n, client,
+                                   cascade=bool(get_cascade_config().get("enabled")))
 
     st.success(f"Done! Showing top {len(scored)} results for **{preferred_role}**.")
+    if prefetched is not None:
+        st.caption("Prefetched on upload: " + ", ".join(
+            f"{name} {secs:.1f}s" for name, secs in prefetched.timings.items()))
     st.divider()
 
     # Keys are the python dict keys stored in scored results
@@ -313,7 +370,8 @@ if run_btn and uploaded:
             st.markdown(
                 f'<div style="text-align:center">'
                 f'<span class="{css_cls}">{score}</span>'
-                f'<br><small style="color:#888">/ 100 fit score</small>'
+                f'<br><small style="color:#888">/ 100 fit score'
+                f'{" (local estimate)" if job.get("score_source") == "local" else ""}</small>'
                 f'</div>',
                 unsafe_allow_html=True,
             )
@@ -354,5 +412,20 @@ if run_btn and uploaded:
 
         st.divider()
 
+    if profile_run is not None and profile_request:
+        with st.expander("🔬 Profile: hottest functions of this request", expanded=False):
+            for stage in profile_run.stages:
+                rss = f"{stage['peak_rss_mb']:.0f} MB" if stage["peak_rss_mb"] is not None else "n/a"
+                st.markdown(
+                    f"**{stage['stage']}** — {stage['wall_s']:.2f}s wall, {stage['cpu_s']:.2f}s CPU, "
+                    f"peak traced {stage['peak_traced_mb']:.1f} MB, peak RSS {rss}"
+                )
+                st.dataframe(
+                    [{"function": r["function"], "self s": round(r["tottime"], 4),
+                      "cum s": round(r["cumtime"], 4), "calls": r["calls"]} for r in stage["hot"][:15]],
+                    use_container_width=True,
+                )
+            st.caption(f"Full report: `{profile_run.dir}`")
+
 elif not uploaded:
     st.info("Upload your resume above to get started.")
\ No newline at end of file
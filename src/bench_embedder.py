@@ -0,0 +1,61 @@
+"""
+bench_embedder.py - Compares the sentence-transformers and ONNX embedding backends.
+Reports texts/second (bulk and single-query) and cosine agreement between them.
+Config: models.embed_model, limits.max_resume_chars_embed, onnx_backend.*
+Usage: python -m src.bench_embedder --model sentence-transformers/all-MiniLM-L6-v2 --repeat 3
+"""
+import json, time, argparse
+from pathlib import Path
+import numpy as np
+from src.config import get_models, get_limits
+from src.embedder import embed_texts, embed_one
+
+CLEAN_PATH = Path("data/jobs/jobs_clean.json")
+
+
+def load_texts(max_chars):
+    jobs = json.loads(CLEAN_PATH.read_text(encoding="utf-8"))
+    return [(j.get("clean_text", "") or "").strip()[:max_chars] for j in jobs]
+
+
+def time_backend(model_string, texts, repeat):
+    embed_texts(texts[:2], model_string)  # load model + warm up outside the timing
+    best_bulk = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        vecs = embed_texts(texts, model_string)
+        best_bulk = min(best_bulk, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for t in texts[:20]:
+        embed_one(t, model_string)
+    per_query = (time.perf_counter() - t0) / max(1, min(20, len(texts)))
+    return vecs, len(texts) / best_bulk, per_query
+
+
+def main(model_name=None, repeat=3):
+    if model_name is None:
+        model_name = get_models()["embed_model"].split(":", 1)[-1]
+    max_chars = int(get_limits().get("max_resume_chars_embed", 1100))
+    texts = load_texts(max_chars)
+    print(f"=== Embedder benchmark: {model_name}  ({len(texts)} texts, best of {repeat}) ===")
+
+    rows = {}
+    for prefix in ("local:", "onnx:"):
+        vecs, tps, per_query = time_backend(prefix + model_name, texts, repeat)
+        rows[prefix] = vecs
+        print(f"{prefix:<7} bulk {tps:>8.1f} texts/s   single query {per_query*1000:>7.1f} ms")
+
+    a, b = rows["local:"], rows["onnx:"]
+    cos = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1) + 1e-12)
+    print(f"\nCosine agreement local vs onnx: mean={cos.mean():.4f}  min={cos.min():.4f}")
+    top_a = np.argsort(-(a @ a[0]))[:10]
+    top_b = np.argsort(-(b @ b[0]))[:10]
+    print(f"Top-10 neighbour overlap for job 0: {len(set(top_a) & set(top_b))}/10")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="model name without the local:/onnx: prefix")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(model_name=args.model, repeat=args.repeat)
@@ -0,0 +1,104 @@
+"""
+bench_scoring.py - Compares single-job (fixed character cuts), token-packed
+single-job and batched LLM scoring on the same matches.
+Reports LLM calls, prompt/completion tokens and wall time per scored job.
+Config: models.chat_model, limits.top_n_score, limits.batch_max_jobs, limits.batch_token_budget
+Usage: python -m src.bench_scoring --role "ML Engineer" --top-n 10 [--budget 1100]
+        (--budget sets limits.prompt_token_budget for the packed path, in-process only)
+"""
+import os, time, argparse
+from types import SimpleNamespace
+from src.config import get_models, get_limits, get_together_base_url
+from src.match_jobs import load_faiss_index, load_resume_text, match_resume_to_jobs
+from src.score_explain import score_top_jobs
+from src.embedder import is_local_model
+
+
+class UsageRecorder:
+    """Wraps a Together client and records token usage and latency of chat calls."""
+
+    def __init__(self, client):
+        self._client    = client
+        self.calls      = []
+        self.embeddings = getattr(client, "embeddings", None)
+        self.chat       = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        t0   = time.perf_counter()
+        resp = self._client.chat.completions.create(**kwargs)
+        usage = getattr(resp, "usage", None)
+        self.calls.append({
+            "latency":           time.perf_counter() - t0,
+            "prompt_tokens":     int(getattr(usage, "prompt_tokens", 0) or 0),
+            "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+        })
+        return resp
+
+
+def run_path(label, resume_text, matches, client, top_n, batch, packed=False):
+    recorder = UsageRecorder(client)
+    t0 = time.perf_counter()
+    scored = score_top_jobs(resume_text, matches, recorder, top_n=top_n, batch=batch, packed=packed)
+    wall = time.perf_counter() - t0
+    n = max(1, len(scored))
+    return {
+        "label":             label,
+        "jobs":              len(scored),
+        "calls":             len(recorder.calls),
+        "prompt_per_job":    sum(c["prompt_tokens"] for c in recorder.calls) / n,
+        "completion_per_job": sum(c["completion_tokens"] for c in recorder.calls) / n,
+        "seconds_per_job":   wall / n,
+        "scores":            [j.get("fit_score", 0) for j in scored],
+    }
+
+
+def print_report(rows):
+    print(f"\n{'path':<10} {'jobs':>5} {'calls':>6} {'prompt/job':>11} {'compl/job':>10} {'sec/job':>8}")
+    for r in rows:
+        print(f"{r['label']:<10} {r['jobs']:>5} {r['calls']:>6} {r['prompt_per_job']:>11.0f} "
+              f"{r['completion_per_job']:>10.0f} {r['seconds_per_job']:>8.2f}")
+    print()
+    for other in rows[1:]:
+        diffs = [abs(a - b) for a, b in zip(rows[0]["scores"], other["scores"])]
+        if diffs:
+            print(f"Mean |fit_score| difference {rows[0]['label']} vs {other['label']}: "
+                  f"{sum(diffs) / len(diffs):.1f}")
+
+
+def main(resume_path=None, preferred_role="Any", top_n=None, budget=None):
+    if budget is not None:
+        from src.config import load_config
+        load_config()["limits"]["prompt_token_budget"] = int(budget)
+    from together import Together
+    api_key = os.environ.get("TOGETHER_API_KEY")
+    if not api_key:
+        raise EnvironmentError("TOGETHER_API_KEY is not set.")
+    client = Together(api_key=api_key, base_url=get_together_base_url())
+    if top_n is None:
+        top_n = int(get_limits().get("top_n_score", 5))
+
+    resume_text = load_resume_text(resume_path)
+    index, meta, clean_jobs = load_faiss_index()
+    embed_model = get_models()["embed_model"]
+    matches = match_resume_to_jobs(
+        resume_text, index, meta, clean_jobs,
+        None if is_local_model(embed_model) else client,
+        preferred_role=preferred_role, top_k=max(top_n, 1),
+    )
+    print(f"=== Scoring benchmark: {len(matches[:top_n])} jobs ===")
+    rows = [
+        run_path("single", resume_text, matches, client, top_n, batch=False),
+        run_path("packed", resume_text, matches, client, top_n, batch=False, packed=True),
+        run_path("batch",  resume_text, matches, client, top_n, batch=True),
+    ]
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", default=None)
+    parser.add_argument("--role", default="Any")
+    parser.add_argument("--top-n", type=int, default=None)
+    parser.add_argument("--budget", type=int, default=None, help="prompt_token_budget for the packed path")
+    args = parser.parse_args()
+    main(resume_path=args.resume, preferred_role=args.role, top_n=args.top_n, budget=args.budget)
@@ -0,0 +1,60 @@
+"""
+bench_shards.py - Measures scatter-gather search throughput as the shard count grows.
+Uses a synthetic corpus of unit vectors so the scaling is visible beyond the
+size of the real job index, and checks every sharded result against an
+in-process IndexFlatIP.
+Usage: python -m src.bench_shards --rows 200000 --shards 1 2 4 8 --queries 200 --batch 16
+"""
+import time, argparse, tempfile
+import numpy as np
+import faiss
+from src.sharded_index import build_shards, ShardedIndex
+
+
+def unit_vectors(n, dim, seed):
+    vecs = np.random.default_rng(seed).standard_normal((n, dim), dtype=np.float32)
+    faiss.normalize_L2(vecs)
+    return vecs
+
+
+def time_search(index, queries, batch, k):
+    t0 = time.perf_counter()
+    for start in range(0, len(queries), batch):
+        index.search(queries[start:start + batch], k)
+    return len(queries) / (time.perf_counter() - t0)
+
+
+def main(rows=200_000, dim=384, shard_counts=(1, 2, 4), num_queries=200, batch=16, k=30):
+    corpus  = unit_vectors(rows, dim, seed=0)
+    queries = unit_vectors(num_queries, dim, seed=1)
+    print(f"=== Shard benchmark: {rows} x {dim}, {num_queries} queries, batch {batch}, k={k} ===")
+
+    flat = faiss.IndexFlatIP(dim)
+    flat.add(corpus)
+    _, exact_ids = flat.search(queries, k)
+    print(f"{'in-process':<12} {time_search(flat, queries, batch, k):>9.1f} q/s   (single IndexFlatIP)")
+
+    for n in shard_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_shards(corpus, n, shard_dir=tmp)
+            index = ShardedIndex(shard_dir=tmp, timeout=60.0)
+            try:
+                index.search(queries[:1], k)  # wait for workers to load
+                qps = time_search(index, queries, batch, k)
+                _, ids = index.search(queries, k)
+                agree = np.mean([len(set(a) & set(b)) / k for a, b in zip(ids, exact_ids)])
+                print(f"{f'{n} shard(s)':<12} {qps:>9.1f} q/s   recall@{k} vs flat: {agree:.3f}")
+            finally:
+                index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--k", type=int, default=30)
+    args = parser.parse_args()
+    main(args.rows, args.dim, args.shards, args.queries, args.batch, args.k)
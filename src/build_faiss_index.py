@@ -1,11 +1,15 @@
+import argparse
 from pathlib import Path
 import numpy as np
 import faiss
+from src.config import get_limits
+from src.profiling import profiled
 
 VEC_PATH = Path("data/index/job_vectors.npy")
 INDEX_PATH = Path("data/index/faiss.index")
 
-def main():
+@profiled("build_faiss_index")
+def main(num_shards=None, rebuild_shard=None):
     if not VEC_PATH.exists():
         raise FileNotFoundError(f"Missing {VEC_PATH}. Run Step 7 first.")
 
@@ -14,6 +18,25 @@ def main():
     n, dim = vecs.shape
     print(f"Loaded vectors: {VEC_PATH}  shape=({n}, {dim})")
 
+    if num_shards is None:
+        num_shards = int(get_limits().get("index_shards", 1))
+    if rebuild_shard is not None and not (num_shards > 1 and 0 <= rebuild_shard < num_shards):
+        raise ValueError(f"--rebuild-shard {rebuild_shard} needs a sharded index containing that shard "
+                         f"(got {num_shards} shard(s)); "
+                         "set limits.index_shards or --shards to the index's shard count.")
+    if num_shards > 1:
+        # Sharded layout: one file per shard, served by one worker process each (src/sharded_index.py)
+        from src.sharded_index import build_shards, MANIFEST_PATH
+        only = None if rebuild_shard is None else [rebuild_shard]
+        manifest = build_shards(vecs, num_shards, only=only)
+        print("DONE ✅")
+        for e in manifest["shards"]:
+            print(f"  shard {e['id']}: {e['count']} vectors -> {e['file']}")
+        print(f"Saved manifest: {MANIFEST_PATH}")
+        if only is not None:
+            print("A running app reloads the rebuilt shard on its next search.")
+        return
+
     # Using inner product (works like cosine similarity because we normalized in Step 7)
     index = faiss.IndexFlatIP(dim)
     index.add(vecs)
@@ -26,4 +49,8 @@ def main():
     print(f"Total vectors in index: {index.ntotal}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, default=None, help="defaults to limits.index_shards")
+    parser.add_argument("--rebuild-shard", type=int, default=None, help="rebuild only this shard id")
+    args = parser.parse_args()
+    main(num_shards=args.shards, rebuild_shard=args.rebuild_shard)
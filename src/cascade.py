@@ -0,0 +1,151 @@
+"""
+cascade.py - Cheap local pre-score that decides which matches reach the LLM.
+  - Every retrieved candidate gets a local 0-100 score from FAISS similarity,
+    skill overlap with the resume (src/skill_index.py) and, optionally, a
+    small cross-encoder.
+  - Candidates at or above cascade.escalate_min_score, or within
+    cascade.uncertainty_margin of it, are scored by the LLM (score_top_jobs).
+  - The rest keep the local score and are marked score_source="local".
+  - The two scales are not comparable, so escalated jobs are ranked by their
+    LLM score and local-only jobs follow in local-score order (they scored
+    below the escalation band anyway).
+Config: cascade.*, limits.top_n_score
+"""
+import math
+import re
+
+from src.config import get_cascade_config, get_limits
+
+_cross_encoder_cache = {}
+
+
+def _get_cross_encoder(model_name: str):
+    if model_name not in _cross_encoder_cache:
+        from sentence_transformers import CrossEncoder
+        print(f"  Loading cross-encoder: {model_name} ...")
+        _cross_encoder_cache[model_name] = CrossEncoder(model_name)
+    return _cross_encoder_cache[model_name]
+
+
+def _contains_term(haystack_lower: str, term: str) -> bool:
+    term = term.strip().lower()
+    if not term:
+        return False
+    return re.search(rf"(?<!\w){re.escape(term)}(?!\w)", haystack_lower) is not None
+
+
+def skill_overlap(resume_lower: str, job: dict):
+    """Splits the job's skills into (matched, missing) against the lower-cased resume.
+    Uses the skill index gaps attached by match_resume_to_jobs when present."""
+    if "matched_skills" in job and "missing_skills" in job:
+        return list(job["matched_skills"]), list(job["missing_skills"])
+    matched, missing = [], []
+    for tag in job.get("tags") or []:
+        (matched if _contains_term(resume_lower, tag) else missing).append(tag)
+    return matched, missing
+
+
+def _normalise_similarity(sim: float, floor: float, ceiling: float) -> float:
+    if ceiling <= floor:
+        return 0.0
+    return max(0.0, min(1.0, (sim - floor) / (ceiling - floor)))
+
+
+def local_scores(resume_text: str, matches: list, cfg: dict = None) -> list:
+    """Returns one dict per match: local_score (0-100), matched_skills, missing_skills."""
+    cfg = cfg or get_cascade_config()
+    floor    = float(cfg.get("sim_floor", 0.3))
+    ceiling  = float(cfg.get("sim_ceiling", 0.75))
+    w_sim    = float(cfg.get("weight_similarity", 0.7))
+    w_skill  = float(cfg.get("weight_skills", 0.3))
+    w_model  = float(cfg.get("weight_model", 0.0))
+    ce_model = cfg.get("cross_encoder_model") or ""
+
+    model_feats = [0.0] * len(matches)
+    if ce_model and w_model > 0 and matches:
+        ce = _get_cross_encoder(ce_model)
+        max_chars = int(get_limits().get("max_job_chars_prompt", 1500))
+        pairs = [(resume_text[:max_chars], (m.get("clean_text") or "")[:max_chars]) for m in matches]
+        model_feats = [1.0 / (1.0 + math.exp(-float(x))) for x in ce.predict(pairs)]
+    else:
+        w_model = 0.0
+
+    total_w = (w_sim + w_skill + w_model) or 1.0
+    resume_lower = (resume_text or "").lower()
+    out = []
+    for m, model_feat in zip(matches, model_feats):
+        matched, missing = skill_overlap(resume_lower, m)
+        n_tags = len(matched) + len(missing)
+        skill_feat = len(matched) / n_tags if n_tags else 0.0
+        sim_feat = _normalise_similarity(float(m.get("score", 0.0)), floor, ceiling)
+        value = (w_sim * sim_feat + w_skill * skill_feat + w_model * model_feat) / total_w
+        out.append({"local_score": int(round(100 * value)),
+                    "matched_skills": matched, "missing_skills": missing})
+    return out
+
+
+def plan_escalation(local: list, top_n: int, cfg: dict = None):
+    """Picks the top_n candidates by local score and splits them into
+    (escalate, keep_local) index lists."""
+    cfg = cfg or get_cascade_config()
+    threshold = float(cfg.get("escalate_min_score", 45))
+    margin    = float(cfg.get("uncertainty_margin", 5))
+    order = sorted(range(len(local)), key=lambda i: -local[i]["local_score"])[:top_n]
+    escalate, keep_local = [], []
+    for i in order:
+        s = local[i]["local_score"]
+        confident = s >= threshold
+        uncertain = abs(s - threshold) <= margin
+        (escalate if (confident or uncertain) else keep_local).append(i)
+    return order, escalate, keep_local
+
+
+def cascade_score_jobs(resume_text, matches, client, top_n=None, debug=False, scored_cache=None):
+    """Drop-in for score_top_jobs that only sends escalated candidates to the LLM.
+    scored_cache (job idx -> LLM result) lets callers re-use earlier LLM scores."""
+    from src.score_explain import score_top_jobs
+    cfg = get_cascade_config()
+    if top_n is None:
+        top_n = int(get_limits().get("top_n_score", 5))
+    cache = {} if scored_cache is None else scored_cache
+
+    local = local_scores(resume_text, matches, cfg)
+    order, escalate, keep_local = plan_escalation(local, top_n, cfg)
+    to_llm = [i for i in escalate if matches[i].get("idx") not in cache]
+    print(f"  Cascade: {len(escalate)} escalated ({len(to_llm)} newly scored), "
+          f"{len(keep_local)} scored locally")
+
+    fresh = {}
+    if to_llm:
+        scored = score_top_jobs(resume_text, [matches[i] for i in to_llm], client,
+                                top_n=len(to_llm), debug=debug)
+        for i, job in zip(to_llm, scored):
+            fresh[i] = job
+            # Failed calls ("LLM error" placeholders) are not cached, so the next run retries them
+            if not job.get("error"):
+                cache[matches[i].get("idx")] = job
+    llm_results = {i: fresh.get(i) or cache[matches[i].get("idx")] for i in escalate}
+
+    # LLM-scored jobs first, by LLM score; local-only jobs after them, by local score
+    ranked  = sorted(escalate, key=lambda i: -float(llm_results[i].get("fit_score") or 0))
+    ranked += keep_local
+    results = []
+    for i in ranked:
+        job = matches[i]
+        loc = local[i]
+        if i in llm_results:
+            entry = {**llm_results[i], "score_source": "llm"}
+        else:
+            n_tags = len(loc["matched_skills"]) + len(loc["missing_skills"])
+            entry = {**job,
+                     "fit_score":       loc["local_score"],
+                     "matched_skills":  loc["matched_skills"],
+                     "missing_skills":  loc["missing_skills"],
+                     "recommendations": [],
+                     "summary": (f"Scored locally (similarity {job.get('score', 0.0):.2f}, "
+                                 f"{len(loc['matched_skills'])}/{n_tags} skills matched); not sent to the LLM."),
+                     "score_source":    "local"}
+        entry["local_score"] = loc["local_score"]
+        entry["rank"] = len(results) + 1
+        results.append(entry)
+    return results
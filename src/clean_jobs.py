@@ -1,6 +1,8 @@
 import json, re
 from pathlib import Path
-from src.config import get_limits, get_noise_patterns
+from src.config import get_limits, get_noise_patterns, get_digest_config
+from src.skill_index import build_skill_index, save_skill_index, SKILL_BITS_PATH
+from src.profiling import profiled
 
 RAW_PATH   = Path("data/jobs/jobs_raw.json")
 OUT_DIR    = Path("data/jobs")
@@ -19,6 +21,47 @@ def remove_noise(text, patterns):
         out = re.sub(pattern, " ", out, flags=re.IGNORECASE)
     return normalize_whitespace(out)
 
+def header_regex(phrase):
+    # Flattened HTML headings: "Nice-to-Have", "WHAT WE’RE LOOKING FOR", "Requirements :"
+    words = [re.escape(w).replace("'", "['’]") for w in re.split(r"[\s-]+", phrase.strip())]
+    return r"(?<!\w)" + r"[\s-]+".join(words) + r"(?!\w)\s*[:?]?"
+
+def find_headers(text, phrases):
+    hits = []
+    for priority, phrase in enumerate(phrases):
+        for m in re.finditer(header_regex(phrase), text, flags=re.IGNORECASE):
+            # Headings are capitalised; lower-case hits are ordinary prose
+            if m.group(0)[0].isupper():
+                hits.append((m.start(), m.end(), priority))
+    hits.sort()
+    # Drop hits nested inside a longer header ("Key Responsibilities" vs "Responsibilities")
+    kept = []
+    for h in hits:
+        if kept and h[0] < kept[-1][1]:
+            if h[1] - h[0] > kept[-1][1] - kept[-1][0]:
+                kept[-1] = h
+            continue
+        kept.append(h)
+    return kept
+
+def extract_digest_sections(description, section_headers, stop_headers, max_chars):
+    """Requirements/skills sections of a description, most important first."""
+    sections = find_headers(description, section_headers)
+    if not sections:
+        return ""
+    bounds = sorted([(a, b, p, True) for a, b, p in sections] +
+                    [(a, b, p, False) for a, b, p in find_headers(description, stop_headers)])
+    parts = []
+    for i, (start, end, priority, is_section) in enumerate(bounds):
+        if not is_section:
+            continue
+        stop = bounds[i + 1][0] if i + 1 < len(bounds) else len(description)
+        body = description[end:stop].strip(" :-•")
+        if body:
+            parts.append((priority, start, f"{description[start:end].strip(' :?')}: {body}"))
+    parts.sort()
+    return normalize_whitespace(" | ".join(p[2] for p in parts))[:max_chars]
+
 def build_clean_text(title, company, location, tags, description):
     tags_part = ", ".join(tags) if tags else ""
     parts = [f"Title: {title}", f"Company: {company}",
@@ -27,12 +70,23 @@ def build_clean_text(title, company, location, tags, description):
              "Description:", description]
     return "\n".join(p for p in parts if p)
 
-def main():
+def build_skills(clean=None):
+    """Skill taxonomy + per-job bitsets from jobs_clean.json (or the given clean jobs)."""
+    if clean is None:
+        clean = json.loads(CLEAN_PATH.read_text(encoding="utf-8"))
+    skills = build_skill_index(clean)
+    save_skill_index(skills)
+    print(f"Skills : {len(skills.vocab)} skills x {len(clean)} jobs -> {SKILL_BITS_PATH}")
+
+@profiled("clean_jobs")
+def main(skills=True):
     if not RAW_PATH.exists():
         raise FileNotFoundError(f"Missing {RAW_PATH}. Run src/fetch_jobs.py first.")
     limits         = get_limits()
     noise_patterns = get_noise_patterns()
     max_chars      = int(limits.get("max_job_chars_clean", 2500))
+    digest_cfg     = get_digest_config()
+    digest_max     = int(digest_cfg.get("max_chars", 1500))
     raw_data = json.loads(RAW_PATH.read_text(encoding="utf-8"))
     raw      = raw_data.get("jobs", raw_data) if isinstance(raw_data, dict) else raw_data
     print(f"Input  : {len(raw)} raw jobs")
@@ -44,13 +98,22 @@ def main():
         url      = j.get("url","")
         tags     = j.get("tags",[]) or []
         desc     = strip_html(j.get("description","") or "")
-        desc     = remove_noise(desc, noise_patterns)[:max_chars]
+        desc     = remove_noise(desc, noise_patterns)
+        # Digest is taken from the full description so late requirement sections are kept
+        sections = extract_digest_sections(desc, digest_cfg.get("section_headers", []),
+                                           digest_cfg.get("stop_headers", []), digest_max)
+        desc     = desc[:max_chars]
+        digest   = build_clean_text(title, company, location, tags, sections) if sections else ""
         clean.append({"id": str(j.get("id","")), "title": title, "company": company,
                       "location": location, "url": url, "tags": tags,
-                      "clean_text": build_clean_text(title, company, location, tags, desc)})
+                      "clean_text": build_clean_text(title, company, location, tags, desc),
+                      "digest": digest})
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     CLEAN_PATH.write_text(json.dumps(clean, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"Output : {len(clean)} clean jobs -> {CLEAN_PATH}")
+    # src/pipeline.py runs the skill index as its own stage (skills=False here)
+    if skills:
+        build_skills(clean)
 
 if __name__ == "__main__":
     main()
@@ -1,3 +1,4 @@
+import os
 import json
 from pathlib import Path
 
@@ -44,5 +45,41 @@ def get_models():
 def get_noise_patterns():
     return load_config().get("noise_patterns", [])
 
+def get_embed_server_config():
+    cfg = dict(load_config().get("embed_server", {}))
+    # EMBED_SERVER_ADDRESS overrides the socket path, e.g. "127.0.0.1:8766" on Windows
+    if os.environ.get("EMBED_SERVER_ADDRESS"):
+        cfg["address"] = os.environ["EMBED_SERVER_ADDRESS"]
+    return cfg
+
+def get_cascade_config():
+    return load_config().get("cascade", {})
+
+def get_pipeline_config():
+    return load_config().get("pipeline", {})
+
+def get_profiling_config():
+    cfg = dict(load_config().get("profiling", {}))
+    # MATCHER_PROFILE=1 turns profiling on for any CLI or the app without editing config
+    if os.environ.get("MATCHER_PROFILE"):
+        cfg["enabled"] = os.environ["MATCHER_PROFILE"].lower() not in ("0", "false", "no")
+    return cfg
+
+def get_prefetch_config():
+    return load_config().get("prefetch", {})
+
+def get_skills_config():
+    return load_config().get("skills", {})
+
+def get_onnx_config():
+    return load_config().get("onnx_backend", {})
+
+def get_digest_config():
+    return load_config().get("digest", {})
+
 def get_job_api_config():
     return load_config().get("job_api", {})
+
+def get_together_base_url():
+    # Set TOGETHER_BASE_URL to point every client at a local stand-in (src/fake_together.py)
+    return os.environ.get("TOGETHER_BASE_URL") or None
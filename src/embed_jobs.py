@@ -7,15 +7,27 @@ import os, json
 from pathlib import Path
 import numpy as np
 import faiss
-from src.config import get_models, get_limits
-from src.embedder import embed_texts
+from src.config import get_models, get_limits, get_together_base_url
+from src.embedder import embed_texts, is_local_model
+from src.job_store import write_job_store, STORE_PATH
+from src.profiling import profiled
 
 CLEAN_PATH = Path("data/jobs/jobs_clean.json")
 OUT_DIR    = Path("data/index")
 VEC_PATH   = OUT_DIR / "job_vectors.npy"
-META_PATH  = OUT_DIR / "job_meta.json"
 
-def main():
+def job_texts(jobs, max_chars):
+    """The exact strings that get embedded, one per job."""
+    return [(j.get("clean_text","") or "").strip()[:max_chars] for j in jobs]
+
+def write_store():
+    """Job store only (no embedding); rows follow jobs_clean.json like the vectors."""
+    jobs = json.loads(CLEAN_PATH.read_text(encoding="utf-8"))
+    write_job_store(jobs, STORE_PATH)
+    print(f"Store saved   : {STORE_PATH}  ({len(jobs)} jobs)")
+
+@profiled("embed_jobs")
+def main(store=True):
     if not CLEAN_PATH.exists():
         raise FileNotFoundError(f"Missing {CLEAN_PATH}. Run src/clean_jobs.py first.")
 
@@ -31,18 +43,18 @@ def main():
     print(f"Max chars/job : {max_chars}")
 
     jobs  = json.loads(CLEAN_PATH.read_text(encoding="utf-8"))
-    texts = [(j.get("clean_text","") or "").strip()[:max_chars] for j in jobs]
+    texts = job_texts(jobs, max_chars)
     print(f"Total jobs    : {len(texts)}")
 
     # Together client only needed for API models
     client = None
-    if not embed_model.startswith("local:"):
+    if not is_local_model(embed_model):
         import os
         from together import Together
         api_key = os.environ.get("TOGETHER_API_KEY")
         if not api_key:
             raise EnvironmentError("TOGETHER_API_KEY is not set.")
-        client = Together(api_key=api_key)
+        client = Together(api_key=api_key, base_url=get_together_base_url())
 
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     all_vecs = []
@@ -57,14 +69,15 @@ def main():
     faiss.normalize_L2(vecs)
     np.save(VEC_PATH, vecs)
 
-    meta = [{"id": j.get("id",""), "title": j.get("title",""), "company": j.get("company",""),
-             "location": j.get("location",""), "url": j.get("url",""), "tags": j.get("tags",[])}
-            for j in jobs]
-    META_PATH.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Single metadata store (rows aligned with the vectors); replaces job_meta.json.
+    # src/pipeline.py writes it as its own stage (store=False here)
+    if store:
+        write_job_store(jobs, STORE_PATH)
 
     print(f"\nDONE")
     print(f"Vectors saved : {VEC_PATH}  shape={vecs.shape}")
-    print(f"Meta saved    : {META_PATH}")
+    if store:
+        print(f"Store saved   : {STORE_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,292 @@
+"""
+embed_server.py - Shared local embedding daemon.
+  - Holds each "local:" / "onnx:" model once and serves embed requests from
+    every local process (Streamlit workers, CLIs, batch jobs) over a Unix
+    socket, or localhost TCP when the address is "host:port".
+  - Requests that arrive within embed_server.batch_wait_ms of each other are
+    encoded together, up to embed_server.max_batch texts per model.
+  - embedder.embed_texts() calls remote_embed() first and falls back to loading
+    the model in-process when the daemon is not running or the call fails.
+    After a failed connect or a reply slower than embed_server.request_timeout it
+    waits embed_server.retry_seconds before trying again.
+  - Security: both sides authenticate with a random per-install key that the
+    server writes to embed_server.key_file (mode 0600) on first start; clients
+    without read access to it cannot connect. Messages are JSON headers plus raw
+    float32 bytes - nothing is unpickled on either side.
+Config: embed_server.enabled, embed_server.address, embed_server.key_file,
+        embed_server.batch_wait_ms, embed_server.max_batch, embed_server.retry_seconds,
+        embed_server.request_timeout  (EMBED_SERVER_ADDRESS env var overrides the address)
+Usage: python -m src.embed_server [--preload local:sentence-transformers/all-MiniLM-L6-v2]
+       python -m src.embed_server --status
+"""
+import os
+import json
+import time
+import secrets
+import queue
+import argparse
+import threading
+from pathlib import Path
+from multiprocessing.connection import Listener, Client
+
+import numpy as np
+
+from src.config import get_embed_server_config, get_models
+
+_local = threading.local()
+_state = {"retry_at": 0.0, "serving": False}
+
+
+def parse_address(address):
+    """"host:port" -> (("host", port), "AF_INET"); anything else is a Unix socket path."""
+    host, sep, port = str(address).rpartition(":")
+    if sep and port.isdigit() and "/" not in host:
+        return (host or "127.0.0.1", int(port)), "AF_INET"
+    return str(address), "AF_UNIX"
+
+
+def _key_path(cfg):
+    return Path(cfg.get("key_file", "data/run/embed.key"))
+
+
+def load_or_create_key(path):
+    """Random per-install key, created once with owner-only permissions."""
+    path = Path(path)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass   # another server created it first
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+    return path.read_text(encoding="utf-8").strip().encode("utf-8")
+
+
+def send_msg(conn, header, payload=None):
+    """One JSON header frame, optionally followed by one raw bytes frame."""
+    conn.send_bytes(json.dumps({**header, "payload": payload is not None}).encode("utf-8"))
+    if payload is not None:
+        conn.send_bytes(payload)
+
+
+def recv_msg(conn, timeout=None):
+    """Returns (header, payload bytes or None); TimeoutError if nothing arrives in time."""
+    if timeout is not None and not conn.poll(timeout):
+        raise TimeoutError(f"no reply within {timeout}s")
+    header = json.loads(conn.recv_bytes().decode("utf-8"))
+    payload = None
+    if header.get("payload"):
+        if timeout is not None and not conn.poll(timeout):
+            raise TimeoutError(f"no reply within {timeout}s")
+        payload = conn.recv_bytes()
+    return header, payload
+
+
+# ── Client side (used by embedder.py) ───────────────────────────────────────────
+def _connect(cfg):
+    address, family = parse_address(cfg.get("address", "data/run/embed.sock"))
+    if family == "AF_UNIX" and not Path(address).exists():
+        raise FileNotFoundError(address)
+    key_path = _key_path(cfg)
+    if not key_path.exists():
+        raise FileNotFoundError(key_path)
+    # Client() authenticates both ways, so a process squatting the address without the key is refused
+    return Client(address, family=family, authkey=key_path.read_text(encoding="utf-8").strip().encode("utf-8"))
+
+
+def _request(header, cfg):
+    timeout = float(cfg.get("request_timeout", 30))
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect(cfg)
+    try:
+        send_msg(conn, header)
+    except (EOFError, OSError):
+        # Daemon restarted since the last call: reconnect once
+        conn.close()
+        conn = _local.conn = _connect(cfg)
+        send_msg(conn, header)
+    try:
+        return recv_msg(conn, timeout)
+    except Exception:
+        # A late reply must never be read as the answer to the next request
+        _local.conn = None
+        conn.close()
+        raise
+
+
+def remote_embed(texts, model_string):
+    """Embeds via the daemon; None when it is disabled, not running, slow or failed."""
+    cfg = get_embed_server_config()
+    if _state["serving"] or not cfg.get("enabled", True) or time.monotonic() < _state["retry_at"]:
+        return None
+    try:
+        header, payload = _request({"op": "embed", "model": model_string, "texts": list(texts)}, cfg)
+    except Exception:
+        _local.conn = None
+        _state["retry_at"] = time.monotonic() + float(cfg.get("retry_seconds", 10))
+        return None
+    if header.get("status") != "ok":
+        print(f"  Embedding server error ({header.get('error')}); embedding in-process.")
+        return None
+    return np.frombuffer(payload, dtype="float32").reshape(header["shape"]).copy()
+
+
+def server_status(cfg=None):
+    cfg = cfg or get_embed_server_config()
+    try:
+        return _request({"op": "status"}, cfg)[0]
+    except Exception as e:
+        return {"running": False, "error": repr(e)}
+
+
+# ── Server side ─────────────────────────────────────────────────────────────────
+class _Job:
+    def __init__(self, model, texts):
+        self.model  = model
+        self.texts  = texts
+        self.result = None
+        self.error  = None
+        self.done   = threading.Event()
+
+
+class EmbedServer:
+    def __init__(self, cfg=None):
+        cfg = cfg or get_embed_server_config()
+        self.address, self.family = parse_address(cfg.get("address", "data/run/embed.sock"))
+        self.authkey    = load_or_create_key(_key_path(cfg))
+        self.batch_wait = float(cfg.get("batch_wait_ms", 5)) / 1000
+        self.max_batch  = int(cfg.get("max_batch", 256))
+        self._queue     = queue.Queue()
+        self.stats      = {"requests": 0, "texts": 0, "batches": 0, "models": []}
+        self._stats_lock = threading.Lock()
+        self._listener  = None
+
+    def preload(self, model_string):
+        from src.embedder import embed_local
+        t0 = time.perf_counter()
+        embed_local(["warm up"], model_string)
+        self.stats["models"].append(model_string)
+        print(f"  Loaded {model_string} in {time.perf_counter() - t0:.1f}s")
+
+    def _batch_loop(self):
+        from src.embedder import embed_local
+        while True:
+            jobs = [self._queue.get()]
+            count = len(jobs[0].texts)
+            deadline = time.monotonic() + self.batch_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                count += len(job.texts)
+
+            by_model = {}
+            for job in jobs:
+                by_model.setdefault(job.model, []).append(job)
+            for model, group in by_model.items():
+                try:
+                    vecs = embed_local([t for job in group for t in job.texts], model)
+                    start = 0
+                    for job in group:
+                        job.result = vecs[start:start + len(job.texts)]
+                        start += len(job.texts)
+                    if model not in self.stats["models"]:
+                        self.stats["models"].append(model)
+                    self.stats["batches"] += 1
+                except Exception as e:
+                    for job in group:
+                        job.error = repr(e)
+                for job in group:
+                    job.done.set()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    msg, _ = recv_msg(conn)
+                except (EOFError, OSError, ValueError):
+                    break
+                payload = None
+                if msg.get("op") == "embed":
+                    texts = [str(t) for t in msg.get("texts", [])]
+                    job = _Job(str(msg.get("model", "")), texts)
+                    self._queue.put(job)
+                    job.done.wait()
+                    with self._stats_lock:
+                        self.stats["requests"] += 1
+                        self.stats["texts"] += len(texts)
+                    if job.error is None:
+                        vecs = np.ascontiguousarray(job.result, dtype="float32")
+                        reply, payload = {"status": "ok", "shape": list(vecs.shape)}, vecs.tobytes()
+                    else:
+                        reply = {"status": "error", "error": job.error}
+                elif msg.get("op") == "status":
+                    reply = {"status": "ok", "running": True, "pid": os.getpid(), **self.stats}
+                else:
+                    reply = {"status": "error", "error": f"unknown op {msg.get('op')!r}"}
+                try:
+                    send_msg(conn, reply, payload)
+                except OSError:
+                    break
+
+    def serve_forever(self):
+        _state["serving"] = True   # never route this process's own embeds back to itself
+        if self.family == "AF_UNIX":
+            path = Path(self.address)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                path.unlink()   # stale socket from a previous run
+        self._listener = Listener(self.address, family=self.family, authkey=self.authkey)
+        if self.family == "AF_UNIX":
+            os.chmod(self.address, 0o600)
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        print(f"Embedding server listening on {self.address}")
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except Exception as e:
+                    # Failed auth or a client that hung up mid-handshake
+                    if self._listener is None:
+                        break
+                    print(f"  Rejected connection: {e!r}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            listener.close()
+
+
+def main(preload=None):
+    server = EmbedServer()
+    for model_string in preload if preload is not None else [get_models()["embed_model"]]:
+        if model_string.startswith(("local:", "onnx:")):
+            server.preload(model_string)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--preload", nargs="*", default=None,
+                        help="models to load at start (default: models.embed_model)")
+    parser.add_argument("--status", action="store_true", help="print the running server's status")
+    args = parser.parse_args()
+    if args.status:
+        print(server_status())
+    else:
+        main(args.preload)
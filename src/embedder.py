@@ -1,13 +1,24 @@
 """
 embedder.py - Unified embedding interface.
   - If embed_model starts with "local:" uses sentence-transformers (free, offline).
+  - If embed_model starts with "onnx:" uses the ONNX Runtime int8 backend
+    (src/onnx_embedder.py) for the same model - faster on CPU-only nodes.
   - Otherwise calls Together.ai embeddings API.
+  - Local models are served by the shared embedding daemon (src/embed_server.py)
+    when it is running, so processes stop loading their own model copy; without
+    it they are loaded in-process as before.
 
 Change the model in config/app_config.json at any time.
 """
 import numpy as np
 
 _local_model_cache = {}
+LOCAL_PREFIXES = ("local:", "onnx:")
+
+
+def is_local_model(model_string: str) -> bool:
+    """True when the model runs in-process and needs no Together client."""
+    return model_string.startswith(LOCAL_PREFIXES)
 
 def _get_local_model(model_name: str):
     if model_name not in _local_model_cache:
@@ -17,17 +28,28 @@ def _get_local_model(model_name: str):
     return _local_model_cache[model_name]
 
 
+def embed_local(texts: list, model_string: str) -> np.ndarray:
+    """Embed with a "local:" or "onnx:" model loaded in this process."""
+    if model_string.startswith("onnx:"):
+        from src.onnx_embedder import get_onnx_model
+        model = get_onnx_model(model_string[len("onnx:"):])
+        return np.asarray(model.encode(texts), dtype="float32")
+    model = _get_local_model(model_string[len("local:"):])
+    vecs = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+    return np.array(vecs, dtype="float32")
+
+
 def embed_texts(texts: list, model_string: str, client=None) -> np.ndarray:
     """
     Embed a list of strings. Returns float32 numpy array of shape (N, dim).
     model_string: "local:sentence-transformers/all-MiniLM-L6-v2"  -> local
+                  "onnx:sentence-transformers/all-MiniLM-L6-v2"   -> local, ONNX Runtime
                   "BAAI/bge-base-en-v1.5"                          -> Together API
     """
-    if model_string.startswith("local:"):
-        model_name = model_string[len("local:"):]
-        model = _get_local_model(model_name)
-        vecs = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
-        return np.array(vecs, dtype="float32")
+    if is_local_model(model_string):
+        from src.embed_server import remote_embed
+        vecs = remote_embed(texts, model_string)
+        return vecs if vecs is not None else embed_local(texts, model_string)
     else:
         if client is None:
             raise ValueError("Together client required for API embedding.")
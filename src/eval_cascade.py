@@ -0,0 +1,99 @@
+"""
+eval_cascade.py - Compares full LLM scoring with cascade scoring on a labelled set.
+Reports LLM calls, NDCG@top_n against the labels and top-3 agreement between paths.
+
+Labelled set (config: cascade.eval_set) is a JSON list of cases:
+  [{"resume": "data/resume/resume.txt", "role": "Any",
+    "labels": {"<job id>": <relevance 0-100>, ...}}]
+The committed set has three sample resumes (data/eval/resumes/) hand-labelled
+against the bundled jobs_clean.json; unlabelled jobs count as 0. Re-label after
+re-fetching jobs.
+Usage: python -m src.eval_cascade --top-n 5
+"""
+import os, json, math, argparse
+from pathlib import Path
+from src.config import get_models, get_limits, get_cascade_config, get_together_base_url
+from src.match_jobs import load_faiss_index, load_resume_text, match_resume_to_jobs
+from src.score_explain import score_top_jobs
+from src.cascade import cascade_score_jobs
+from src.bench_scoring import UsageRecorder
+from src.embedder import is_local_model
+
+
+def ndcg(ranked_ids, labels, k):
+    gains = [float(labels.get(j, 0)) for j in ranked_ids[:k]]
+    dcg   = sum(g / math.log2(i + 2) for i, g in enumerate(gains))
+    ideal = sorted((float(v) for v in labels.values()), reverse=True)[:k]
+    idcg  = sum(g / math.log2(i + 2) for i, g in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def _job_id(job):
+    return str(job.get("id") or job.get("idx"))
+
+
+def ranked_ids(scored):
+    return [_job_id(j) for j in sorted(scored, key=lambda j: -j.get("fit_score", 0))]
+
+
+def run_case(case, index, meta, clean_jobs, client, top_n):
+    resume_text = load_resume_text(case.get("resume"))
+    embed_model = get_models()["embed_model"]
+    matches = match_resume_to_jobs(
+        resume_text, index, meta, clean_jobs,
+        None if is_local_model(embed_model) else client,
+        preferred_role=case.get("role", "Any"),
+    )
+    labels = {str(k): v for k, v in case.get("labels", {}).items()}
+
+    full_rec, casc_rec = UsageRecorder(client), UsageRecorder(client)
+    full = score_top_jobs(resume_text, matches, full_rec, top_n=top_n)
+    casc = cascade_score_jobs(resume_text, matches, casc_rec, top_n=top_n)
+    # The cascade's own order: its LLM and local scores are not on one scale
+    full_ids, casc_ids = ranked_ids(full), [_job_id(j) for j in casc]
+    if not any(_job_id(m) in labels for m in matches):
+        print(f"  Warning: no labelled job in this case's matches ({case.get('resume')}); "
+              "re-label after re-fetching jobs.")
+    return {
+        "full_calls":  len(full_rec.calls),
+        "casc_calls":  len(casc_rec.calls),
+        "full_ndcg":   ndcg(full_ids, labels, top_n),
+        "casc_ndcg":   ndcg(casc_ids, labels, top_n),
+        "top3_agree":  len(set(full_ids[:3]) & set(casc_ids[:3])) / max(1, min(3, len(full_ids))),
+    }
+
+
+def main(eval_path=None, top_n=None):
+    from together import Together
+    api_key = os.environ.get("TOGETHER_API_KEY")
+    if not api_key:
+        raise EnvironmentError("TOGETHER_API_KEY is not set.")
+    client = Together(api_key=api_key, base_url=get_together_base_url())
+    eval_path = Path(eval_path or get_cascade_config().get("eval_set", "data/eval/labelled_matches.json"))
+    if not eval_path.exists():
+        raise FileNotFoundError(f"Missing labelled set: {eval_path}")
+    if top_n is None:
+        top_n = int(get_limits().get("top_n_score", 5))
+
+    cases = json.loads(eval_path.read_text(encoding="utf-8"))
+    index, meta, clean_jobs = load_faiss_index()
+    rows = [run_case(c, index, meta, clean_jobs, client, top_n) for c in cases]
+
+    print(f"\n=== Cascade evaluation: {len(rows)} cases, top_n={top_n} ===")
+    print(f"{'case':>4} {'full calls':>10} {'casc calls':>10} {'full ndcg':>9} {'casc ndcg':>9} {'top3 agree':>10}")
+    for i, r in enumerate(rows, start=1):
+        print(f"{i:>4} {r['full_calls']:>10} {r['casc_calls']:>10} {r['full_ndcg']:>9.3f} "
+              f"{r['casc_ndcg']:>9.3f} {r['top3_agree']:>10.2f}")
+    if rows:
+        n = len(rows)
+        print(f"{'mean':>4} {sum(r['full_calls'] for r in rows)/n:>10.1f} {sum(r['casc_calls'] for r in rows)/n:>10.1f} "
+              f"{sum(r['full_ndcg'] for r in rows)/n:>9.3f} {sum(r['casc_ndcg'] for r in rows)/n:>9.3f} "
+              f"{sum(r['top3_agree'] for r in rows)/n:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--eval-set", default=None)
+    parser.add_argument("--top-n", type=int, default=None)
+    args = parser.parse_args()
+    main(eval_path=args.eval_set, top_n=args.top_n)
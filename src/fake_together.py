@@ -0,0 +1,198 @@
+"""
+fake_together.py - Local stand-in for the Together.ai endpoints this repo uses.
+  - POST /v1/embeddings        (embedder.py)
+  - POST /v1/chat/completions  (score_explain.py, single and batch prompts)
+  - GET  /v1/models            (model_search.py)
+
+Outputs are deterministic (seeded from the request content). Latency, 5xx
+errors and 429 rate limits are injected per request from a seeded RNG.
+Point clients at it with:
+  TOGETHER_BASE_URL=http://127.0.0.1:8765/v1  TOGETHER_API_KEY=fake
+
+Usage: python -m src.fake_together --port 8765 --latency lognormal --latency-ms 400 --rate-limit 0.02
+"""
+import re, json, math, time, random, hashlib, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "PyTorch", "FastAPI",
+          "Terraform", "React", "Spark", "Airflow", "LLM", "CI/CD", "Go"]
+MODELS = [
+    {"id": "meta-llama/Llama-3.2-3B-Instruct-Turbo", "type": "chat",
+     "display_name": "Llama 3.2 3B Instruct Turbo", "context_length": 131072,
+     "pricing": {"input": 0.06, "output": 0.06}},
+    {"id": "fake/embed-384", "type": "embedding", "display_name": "Fake Embed 384",
+     "context_length": 512, "pricing": {"input": 0.0}},
+]
+
+
+def _seed(*parts) -> int:
+    return int(hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()[:16], 16)
+
+
+def fake_embedding(text: str, dim: int) -> list:
+    rng = random.Random(_seed("embed", text))
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _block(rng) -> list:
+    skills = rng.sample(SKILLS, 6)
+    return [
+        f"FIT_SCORE: {rng.randint(10, 95)}",
+        f"MATCHED_SKILLS: {', '.join(skills[:3])}",
+        f"MISSING_SKILLS: {', '.join(skills[3:5])}",
+        f"RECOMMENDATIONS: Build a project with {skills[3]}, Highlight {skills[0]} experience",
+        "SUMMARY: Deterministic fake assessment for load testing.",
+    ]
+
+
+def fake_completion(prompt: str) -> str:
+    """Single-job prompts get one KEY:VALUE block; batch prompts get JOB <n> blocks."""
+    rng = random.Random(_seed("chat", prompt))
+    num_jobs = len(re.findall(r"^JOB \d+:$", prompt, flags=re.MULTILINE))
+    if "JOBS:" not in prompt or num_jobs < 1:
+        return "\n".join(_block(rng))
+    lines = []
+    for n in range(1, num_jobs + 1):
+        lines.append(f"JOB {n}")
+        lines.extend(_block(rng))
+    return "\n".join(lines)
+
+
+class FakeSettings:
+    def __init__(self, latency="fixed", latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 rate_limit=0.0, dim=384, seed=0):
+        self.latency    = latency
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms  = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.rate_limit = float(rate_limit)
+        self.dim        = int(dim)
+        self._rng       = random.Random(seed)
+        self._lock      = threading.Lock()
+
+    def draw(self):
+        """Returns (delay_seconds, fault) where fault is None, 429 or 500."""
+        with self._lock:
+            if self.latency == "uniform":
+                ms = self._rng.uniform(max(0.0, self.latency_ms - self.jitter_ms), self.latency_ms + self.jitter_ms)
+            elif self.latency == "lognormal" and self.latency_ms > 0:
+                # latency_ms is the median; jitter_ms sets the spread (sigma = jitter/median)
+                sigma = self.jitter_ms / self.latency_ms if self.jitter_ms else 0.5
+                ms = self._rng.lognormvariate(math.log(self.latency_ms), sigma)
+            else:
+                ms = self.latency_ms
+            roll = self._rng.random()
+        fault = 429 if roll < self.rate_limit else (500 if roll < self.rate_limit + self.error_rate else None)
+        return ms / 1000.0, fault
+
+
+def _approx_tokens(text: str) -> int:
+    return len(text or "") // 4 + 1
+
+
+class FakeTogetherHandler(BaseHTTPRequestHandler):
+    settings = FakeSettings()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject(self) -> bool:
+        delay, fault = self.settings.draw()
+        if delay:
+            time.sleep(delay)
+        if fault == 429:
+            self._send(429, {"error": {"message": "Rate limit exceeded (fake)", "type": "rate_limit"}},
+                       {"Retry-After": "1"})
+            return True
+        if fault == 500:
+            self._send(500, {"error": {"message": "Internal error (fake)", "type": "server_error"}})
+            return True
+        return False
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/v1/models"):
+            if not self._inject():
+                self._send(200, MODELS)
+            return
+        self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"error": {"message": "Invalid JSON"}})
+            return
+        path = self.path.rstrip("/")
+        if path.endswith("/v1/embeddings"):
+            if self._inject():
+                return
+            inputs = body.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            data = [{"object": "embedding", "index": i, "embedding": fake_embedding(t, self.settings.dim)}
+                    for i, t in enumerate(inputs)]
+            tokens = sum(_approx_tokens(t) for t in inputs)
+            self._send(200, {"object": "list", "model": body.get("model", ""), "data": data,
+                             "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+        elif path.endswith("/v1/chat/completions"):
+            if self._inject():
+                return
+            prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+            content = fake_completion(prompt)
+            p_tok, c_tok = _approx_tokens(prompt), _approx_tokens(content)
+            self._send(200, {
+                "id": f"fake-{_seed(prompt) % 10**12}", "object": "chat.completion",
+                "created": int(time.time()), "model": body.get("model", ""),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": p_tok, "completion_tokens": c_tok,
+                          "total_tokens": p_tok + c_tok},
+            })
+        else:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+
+def make_server(host="127.0.0.1", port=8765, settings=None):
+    handler = type("Handler", (FakeTogetherHandler,), {"settings": settings or FakeSettings()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixed value / mean / median")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform half-width / lognormal spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    settings = FakeSettings(args.latency, args.latency_ms, args.jitter_ms, args.error_rate,
+                            args.rate_limit, args.dim, args.seed)
+    server = make_server(args.host, args.port, settings)
+    print(f"Fake Together.ai listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
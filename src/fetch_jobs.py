@@ -2,6 +2,7 @@ import json, time, argparse
 from pathlib import Path
 import requests
 from src.config import get_limits, get_job_api_config, get_roles
+from src.profiling import profiled
 
 OUT_DIR = Path("data/jobs")
 
@@ -33,6 +34,7 @@ def job_matches_role(job, role, roles_cfg):
                          " ".join(job.get("tags",[]) or [])]).lower()
     return any(k.lower() in haystack for k in keywords)
 
+@profiled("fetch_jobs")
 def main(preferred_role="Any"):
     limits    = get_limits()
     api_cfg   = get_job_api_config()
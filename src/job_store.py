@@ -0,0 +1,127 @@
+"""
+job_store.py - Compact SQLite metadata store for indexed jobs.
+  - One row per FAISS position: id, title, company, location, url, tags.
+  - clean_text and the job digest (requirements/skills sections, see
+    clean_jobs.py) live in the same table but are only read for the hits
+    that need them.
+  - Opening the store is O(1); nothing is parsed into Python up front, so
+    memory per worker and load time stay flat as the corpus grows.
+
+Written by embed_jobs.py, read through load_faiss_index() in match_jobs.py.
+JobStore behaves like the old meta list (len, [row]) and JobStore.texts like
+the old clean_jobs list, so callers did not have to change.
+"""
+import json
+import os
+import sqlite3
+from pathlib import Path
+from threading import Lock
+
+STORE_PATH = Path("data/index/jobs.db")
+
+_META_COLS = ("id", "title", "company", "location", "url", "tags")
+
+
+def write_job_store(jobs: list, store_path=STORE_PATH):
+    """Writes jobs (in FAISS order) to a fresh store, swapped in atomically."""
+    store_path = Path(store_path)
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_suffix(store_path.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.execute(
+            "CREATE TABLE jobs (row INTEGER PRIMARY KEY, id TEXT, title TEXT, company TEXT, "
+            "location TEXT, url TEXT, tags TEXT, clean_text TEXT, digest TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((row, str(j.get("id", "")), j.get("title", ""), j.get("company", ""),
+              j.get("location", ""), j.get("url", ""),
+              json.dumps(j.get("tags", []) or [], ensure_ascii=False), j.get("clean_text", ""),
+              j.get("digest", ""))
+             for row, j in enumerate(jobs)),
+        )
+        conn.execute("CREATE INDEX idx_jobs_id ON jobs(id)")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+class _TextView:
+    """Sequence-like view over clean_text: view[row] -> {"clean_text": ...}."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, row):
+        return {"clean_text": self._store.get_texts([row]).get(row, "")}
+
+    def get_texts(self, rows):
+        return self._store.get_texts(rows)
+
+    def get_digests(self, rows):
+        return self._store.get_digests(rows)
+
+
+class JobStore:
+    def __init__(self, store_path=STORE_PATH):
+        self.path    = Path(store_path)
+        self._conn   = sqlite3.connect(f"file:{self.path.as_posix()}?mode=ro", uri=True,
+                                       check_same_thread=False)
+        self._lock   = Lock()
+        self._len    = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        self.columns = {r[1] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+        self.texts   = _TextView(self)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, row):
+        rows = self.get_many([row])
+        if not rows:
+            raise IndexError(row)
+        return rows[0]
+
+    def _select(self, cols, rows):
+        rows = [int(r) for r in rows]
+        if not rows:
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        sql = f"SELECT row, {', '.join(cols)} FROM jobs WHERE row IN ({placeholders})"
+        with self._lock:
+            return {r[0]: r[1:] for r in self._conn.execute(sql, rows)}
+
+    def get_meta(self, rows):
+        """{row: small fields} for the given rows; rows not in the store are absent."""
+        out = {}
+        for r, vals in self._select(_META_COLS, rows).items():
+            m = dict(zip(_META_COLS, vals))
+            m["tags"] = json.loads(m["tags"] or "[]")
+            out[r] = m
+        return out
+
+    def get_many(self, rows):
+        """Small fields for the given rows, in the given order (missing rows skipped)."""
+        found = self.get_meta(rows)
+        return [found[int(r)] for r in rows if int(r) in found]
+
+    def get_texts(self, rows):
+        """{row: clean_text} for the given rows only."""
+        return {r: vals[0] for r, vals in self._select(("clean_text",), rows).items()}
+
+    def get_digests(self, rows):
+        """{row: digest} for the given rows; empty for stores built before digests existed."""
+        if "digest" not in self.columns:
+            return {}
+        return {r: vals[0] or "" for r, vals in self._select(("digest",), rows).items()}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
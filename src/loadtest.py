@@ -0,0 +1,133 @@
+"""
+loadtest.py - Drives the match + score path at a fixed concurrency and reports
+throughput and p50/p95/p99 latency per request.
+
+Meant to run against src/fake_together.py so no key or money is needed:
+  python -m src.loadtest --fake --fake-latency-ms 300 --requests 200 --concurrency 16
+or against any server set through TOGETHER_BASE_URL.
+Config: models.*, limits.top_k_retrieve, limits.top_n_score
+Usage: python -m src.loadtest --requests 100 --concurrency 8 --role "ML Engineer"
+"""
+import os, math, time, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import load_config, get_limits, get_together_base_url
+from src.match_jobs import load_faiss_index, load_resume_text, match_resume_to_jobs
+from src.score_explain import score_top_jobs
+from src.embedder import is_local_model
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def one_request(i, resume_text, index, meta, clean_jobs, client, role, top_k, top_n, vary):
+    # --vary makes every resume unique so the resume cache cannot short-circuit embedding
+    text = f"{resume_text}\nRequest {i}" if vary else resume_text
+    embed_client = None if is_local_model(load_config()["models"]["embed_model"]) else client
+    t0 = time.perf_counter()
+    matches = match_resume_to_jobs(text, index, meta, clean_jobs, embed_client,
+                                   preferred_role=role, top_k=top_k)
+    t_match = time.perf_counter() - t0
+    scored = score_top_jobs(text, matches, client, top_n=top_n)
+    llm_errors = sum(1 for j in scored if str(j.get("summary", "")).startswith("LLM error"))
+    return time.perf_counter() - t0, t_match, llm_errors
+
+
+def run(num_requests, concurrency, resume_text, client, role="Any", top_k=None, top_n=None, vary=True):
+    limits = get_limits()
+    top_k = top_k or int(limits.get("top_k_retrieve", 10))
+    top_n = top_n or int(limits.get("top_n_score", 5))
+    index, meta, clean_jobs = load_faiss_index()
+    latencies, match_latencies, failures, llm_errors = [], [], [], 0
+    lock = threading.Lock()
+
+    def task(i):
+        nonlocal llm_errors
+        try:
+            total, t_match, errs = one_request(i, resume_text, index, meta, clean_jobs,
+                                               client, role, top_k, top_n, vary)
+            with lock:
+                latencies.append(total)
+                match_latencies.append(t_match)
+                llm_errors += errs
+        except Exception as e:
+            with lock:
+                failures.append(repr(e))
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(task, range(num_requests)))
+    wall = time.perf_counter() - t0
+    return {"requests": num_requests, "concurrency": concurrency, "wall": wall,
+            "ok": len(latencies), "failed": len(failures), "llm_errors": llm_errors,
+            "throughput": len(latencies) / wall if wall else 0.0,
+            "latencies": latencies, "match_latencies": match_latencies,
+            "first_failure": failures[0] if failures else ""}
+
+
+def print_report(r):
+    print(f"\n=== Load test: {r['requests']} requests @ concurrency {r['concurrency']} ===")
+    print(f"OK / failed      : {r['ok']} / {r['failed']}   (LLM errors inside results: {r['llm_errors']})")
+    print(f"Wall time        : {r['wall']:.2f}s")
+    print(f"Throughput       : {r['throughput']:.2f} req/s")
+    for label, values in (("End-to-end", r["latencies"]), ("Match only", r["match_latencies"])):
+        print(f"{label:<17}: p50={percentile(values, 50)*1000:.0f}ms  "
+              f"p95={percentile(values, 95)*1000:.0f}ms  p99={percentile(values, 99)*1000:.0f}ms")
+    if r["first_failure"]:
+        print(f"First failure    : {r['first_failure']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--role", default="Any")
+    parser.add_argument("--resume", default=None)
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--top-n", type=int, default=None)
+    parser.add_argument("--no-vary", action="store_true", help="reuse the identical resume text (cache hits)")
+    parser.add_argument("--embed-model", default=None, help="override models.embed_model for this run")
+    parser.add_argument("--fake", action="store_true", help="start src/fake_together.py in-process")
+    parser.add_argument("--fake-latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0)
+    parser.add_argument("--fake-jitter-ms", type=float, default=150.0)
+    parser.add_argument("--fake-error-rate", type=float, default=0.0)
+    parser.add_argument("--fake-rate-limit", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.embed_model:
+        # In-process override only; app_config.json is left untouched
+        load_config()["models"]["embed_model"] = args.embed_model
+
+    server = None
+    if args.fake:
+        from src.fake_together import FakeSettings, make_server
+        settings = FakeSettings(args.fake_latency, args.fake_latency_ms, args.fake_jitter_ms,
+                                args.fake_error_rate, args.fake_rate_limit)
+        server = make_server("127.0.0.1", 0, settings)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ["TOGETHER_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        os.environ.setdefault("TOGETHER_API_KEY", "fake")
+        print(f"Fake Together.ai on {os.environ['TOGETHER_BASE_URL']}")
+
+    from together import Together
+    api_key = os.environ.get("TOGETHER_API_KEY")
+    if not api_key:
+        raise EnvironmentError("TOGETHER_API_KEY is not set.")
+    client = Together(api_key=api_key, base_url=get_together_base_url())
+
+    try:
+        report = run(args.requests, args.concurrency, load_resume_text(args.resume), client,
+                     role=args.role, top_k=args.top_k, top_n=args.top_n, vary=not args.no_vary)
+        print_report(report)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 """
 match_jobs.py - Embeds the resume and retrieves top-K matching jobs via FAISS.
 Config: models.embed_model, limits.top_k_retrieve, limits.max_resume_chars_embed, roles
+Matched/missing skills come from the skill index built by clean_jobs.py (src/skill_index.py).
+Job metadata is read from the SQLite store (src/job_store.py); clean_text only for returned hits.
+The resume query vector is cached per (resume text, embed model) in src/resume_cache.py.
 Usage: python src/match_jobs.py
 """
 import os, json
@@ -9,14 +12,26 @@ import numpy as np
 import faiss
 from pypdf import PdfReader
 from src.config import get_models, get_limits, get_roles
-from src.embedder import embed_one
+from src.resume_cache import get_resume_vector
+from src.skill_index import load_skill_index
+from src.job_store import JobStore, STORE_PATH
+from src.profiling import profiled
 
 INDEX_PATH = Path("data/index/faiss.index")
 META_PATH  = Path("data/index/job_meta.json")
 CLEAN_PATH = Path("data/jobs/jobs_clean.json")
 RESUME_DIR = Path("data/resume")
 
-def load_faiss_index(index_path=INDEX_PATH, meta_path=META_PATH, clean_path=CLEAN_PATH):
+def load_faiss_index(index_path=INDEX_PATH, meta_path=META_PATH, clean_path=CLEAN_PATH,
+                     store_path=STORE_PATH):
+    # Preferred: SQLite job store (meta + lazily read clean_text). JSON files are the legacy layout.
+    if Path(store_path).exists() and int(get_limits().get("index_shards", 1)) > 1:
+        from src.sharded_index import ShardedIndex
+        store = JobStore(store_path)
+        return ShardedIndex(), store, store.texts
+    if Path(store_path).exists() and Path(index_path).exists():
+        store = JobStore(store_path)
+        return faiss.read_index(str(index_path)), store, store.texts
     for p in [index_path, meta_path, clean_path]:
         if not Path(p).exists():
             raise FileNotFoundError(f"Missing {p}. Run the full pipeline first.")
@@ -25,6 +40,31 @@ def load_faiss_index(index_path=INDEX_PATH, meta_path=META_PATH, clean_path=CLEA
     clean_jobs = json.loads(Path(clean_path).read_text(encoding="utf-8"))
     return index, meta, clean_jobs
 
+def fetch_meta(meta, idxs):
+    """{idx: meta} for the hits; rows missing from the store are logged and left out."""
+    if hasattr(meta, "get_meta"):
+        found = meta.get_meta(idxs)
+    else:
+        found = {i: meta[i] for i in idxs if 0 <= i < len(meta)}
+    missing = [i for i in idxs if i not in found]
+    if missing:
+        print(f"  Warning: {len(missing)} hit(s) not in the job store (index and store out of sync?), "
+              f"skipped: rows {missing[:10]}")
+    return found
+
+def fill_clean_text(results, clean_jobs):
+    idxs = [r["idx"] for r in results]
+    if hasattr(clean_jobs, "get_texts"):
+        texts   = clean_jobs.get_texts(idxs)
+        digests = clean_jobs.get_digests(idxs)
+    else:
+        texts   = {i: clean_jobs[i].get("clean_text","") for i in idxs if i < len(clean_jobs)}
+        digests = {i: clean_jobs[i].get("digest","") for i in idxs if i < len(clean_jobs)}
+    for r in results:
+        r["clean_text"] = texts.get(r["idx"], "")
+        r["digest"]     = digests.get(r["idx"], "")
+    return results
+
 def extract_text_from_pdf(pdf_path):
     reader = PdfReader(pdf_path)
     return "\n".join((p.extract_text() or "") for p in reader.pages)
@@ -51,54 +91,74 @@ def role_match(job, preferred_role, roles_cfg):
                          job.get("location",""), " ".join(job.get("tags",[]) or [])]).lower()
     return any(k.lower() in haystack for k in keywords)
 
-def match_resume_to_jobs(resume_text, index, meta, clean_jobs, client=None,
-                          preferred_role="Any", top_k=None):
-    limits    = get_limits()
-    models    = get_models()
-    roles_cfg = get_roles()
-    if top_k is None:
-        top_k = int(limits.get("top_k_retrieve", 10))
-    embed_model = models["embed_model"]
-    max_chars   = int(limits.get("max_resume_chars_embed", 1100))
+def make_result(rank, score, idx, m):
+    return {"rank": rank, "score": float(score), "idx": idx, "id": m.get("id",""),
+            "title": m.get("title",""), "company": m.get("company",""),
+            "location": m.get("location",""), "url": m.get("url",""),
+            "tags": m.get("tags",[])}
 
+def embed_resume_query(resume_text, client=None):
+    """Trimmed, cached and L2-normalised resume query vector of shape (1, dim)."""
+    limits      = get_limits()
+    embed_model = get_models()["embed_model"]
+    max_chars   = int(limits.get("max_resume_chars_embed", 1100))
     trimmed = resume_text.strip()[:max_chars]
-    vec     = embed_one(trimmed, embed_model, client).reshape(1, -1)
+    vec     = get_resume_vector(trimmed, embed_model, client).reshape(1, -1)
     faiss.normalize_L2(vec)
+    return vec
 
-    search_k = min(top_k * 3, index.ntotal)
+def search_hits(vec, index, meta, search_k):
+    """FAISS search -> [(score, idx), ...] restricted to rows present in meta."""
+    search_k = min(search_k, index.ntotal)
+    if search_k <= 0:
+        return []
     scores, indices = index.search(vec, search_k)
+    return [(float(s), int(i)) for s, i in zip(scores[0], indices[0]) if 0 <= int(i) < len(meta)]
 
+def select_matches(hits, metas, preferred_role, top_k):
+    roles_cfg = get_roles()
     results = []
-    for score, idx in zip(scores[0], indices[0]):
-        idx = int(idx)
-        if idx < 0 or idx >= len(meta):
+    for score, idx in hits:
+        m = metas.get(idx)
+        if m is None or not role_match(m, preferred_role, roles_cfg):
             continue
-        m   = meta[idx]
-        job = clean_jobs[idx] if idx < len(clean_jobs) else {}
-        if not role_match(m, preferred_role, roles_cfg):
-            continue
-        results.append({"rank": len(results)+1, "score": float(score), "idx": idx,
-                        "title": m.get("title",""), "company": m.get("company",""),
-                        "location": m.get("location",""), "url": m.get("url",""),
-                        "tags": m.get("tags",[]), "clean_text": job.get("clean_text","")})
+        results.append(make_result(len(results)+1, score, idx, m))
         if len(results) >= top_k:
             break
 
     if len(results) < 3 and preferred_role != "Any":
         results = []
-        for score, idx in zip(scores[0], indices[0]):
-            idx = int(idx)
-            if idx < 0 or idx >= len(meta):
+        for score, idx in hits:
+            if idx not in metas:
                 continue
-            m   = meta[idx]
-            job = clean_jobs[idx] if idx < len(clean_jobs) else {}
-            results.append({"rank": len(results)+1, "score": float(score), "idx": idx,
-                            "title": m.get("title",""), "company": m.get("company",""),
-                            "location": m.get("location",""), "url": m.get("url",""),
-                            "tags": m.get("tags",[]), "clean_text": job.get("clean_text","")})
+            results.append(make_result(len(results)+1, score, idx, metas[idx]))
             if len(results) >= top_k:
                 break
     return results
 
+def attach_skill_gaps(results, resume_text, meta):
+    # Deterministic skill gaps from the precomputed index; the LLM may refine them later
+    skills = load_skill_index()
+    if skills is not None and results and skills.bits.shape[0] == len(meta):
+        gaps = skills.gaps(resume_text, [r["idx"] for r in results])
+        for r, (matched, missing) in zip(results, gaps):
+            r["matched_skills"], r["missing_skills"] = matched, missing
+    return results
+
+@profiled("match_resume_to_jobs")
+def match_resume_to_jobs(resume_text, index, meta, clean_jobs, client=None,
+                          preferred_role="Any", top_k=None):
+    if top_k is None:
+        top_k = int(get_limits().get("top_k_retrieve", 10))
+
+    vec   = embed_resume_query(resume_text, client)
+    hits  = search_hits(vec, index, meta, top_k * 3)
+    metas = fetch_meta(meta, [idx for _, idx in hits])
+
+    results = select_matches(hits, metas, preferred_role, top_k)
+    # clean_text is only read for the hits we return
+    fill_clean_text(results, clean_jobs)
+    return attach_skill_gaps(results, resume_text, meta)
+
 if __name__ == "__main__":
     print("Use: python src/match_jobs.py --role \"ML Engineer\"")
@@ -14,7 +14,9 @@ CONFIG_PATH = Path("config/app_config.json")
 def fetch_together_models(api_key: str) -> list:
     """Call Together.ai /v1/models and return the full model list."""
     headers = {"Authorization": f"Bearer {api_key}"}
-    resp = requests.get(TOGETHER_MODELS_URL, headers=headers, timeout=15)
+    base_url = os.environ.get("TOGETHER_BASE_URL")
+    url = f"{base_url.rstrip('/')}/models" if base_url else TOGETHER_MODELS_URL
+    resp = requests.get(url, headers=headers, timeout=15)
     resp.raise_for_status()
     return resp.json()
 
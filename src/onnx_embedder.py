@@ -0,0 +1,89 @@
+"""
+onnx_embedder.py - ONNX Runtime backend for the local embedder (CPU, int8).
+  - Selected in embedder.py by the "onnx:" model prefix, e.g.
+    "onnx:sentence-transformers/all-MiniLM-L6-v2".
+  - Loads an exported ONNX graph of the same model (by default the int8
+    dynamically-quantized file published in the model repo's onnx/ folder),
+    or a local directory containing it.
+  - Tuned intra-op threads and length-bucketed batching: texts are sorted by
+    token length so each batch is padded only to its own longest text.
+  - Mean pooling + L2 normalisation, matching sentence-transformers output.
+Config: onnx_backend.file_name, onnx_backend.intra_op_threads,
+        onnx_backend.batch_size, onnx_backend.max_seq_length
+Requires: pip install onnxruntime transformers huggingface_hub
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+from src.config import get_onnx_config
+
+_onnx_model_cache = {}
+
+
+class OnnxEmbedder:
+    def __init__(self, model_name: str, cfg: dict = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        cfg = cfg or get_onnx_config()
+        file_name = cfg.get("file_name", "onnx/model_quint8_avx2.onnx")
+        threads   = int(cfg.get("intra_op_threads", 0)) or (os.cpu_count() or 1)
+        self.batch_size     = int(cfg.get("batch_size", 32))
+        self.max_seq_length = int(cfg.get("max_seq_length", 256))
+
+        local_dir = Path(model_name)
+        if local_dir.is_dir():
+            model_path = str(local_dir / file_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(str(local_dir))
+        else:
+            from huggingface_hub import hf_hub_download
+            model_path = hf_hub_download(repo_id=model_name, filename=file_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=opts,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _run_batch(self, token_ids: list) -> np.ndarray:
+        width = max(len(ids) for ids in token_ids)
+        input_ids = np.zeros((len(token_ids), width), dtype=np.int64)
+        attention = np.zeros((len(token_ids), width), dtype=np.int64)
+        for row, ids in enumerate(token_ids):
+            input_ids[row, :len(ids)] = ids
+            attention[row, :len(ids)] = 1
+        feeds = {"input_ids": input_ids, "attention_mask": attention}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]
+        mask   = attention[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms  = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def encode(self, texts: list) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+        token_ids = self.tokenizer(list(texts), truncation=True, max_length=self.max_seq_length,
+                                   padding=False)["input_ids"]
+        order = sorted(range(len(texts)), key=lambda i: len(token_ids[i]))
+        out = None
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            vecs  = self._run_batch([token_ids[i] for i in batch])
+            if out is None:
+                out = np.empty((len(texts), vecs.shape[1]), dtype="float32")
+            out[batch] = vecs
+        return out
+
+
+def get_onnx_model(model_name: str) -> OnnxEmbedder:
+    if model_name not in _onnx_model_cache:
+        print(f"  Loading ONNX model: {model_name} ...")
+        _onnx_model_cache[model_name] = OnnxEmbedder(model_name)
+    return _onnx_model_cache[model_name]
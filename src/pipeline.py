@@ -0,0 +1,308 @@
+"""
+pipeline.py - One entry point for the data pipeline that only redoes stale stages.
+  - Stages: fetch -> clean -> {skills, store, embed -> index}. skills, store and
+    embed only need jobs_clean.json, so they run in parallel.
+  - Each stage is fingerprinted by its input files, the config keys it reads and
+    its source files; embed is fingerprinted by the exact texts it embeds, so a
+    digest or skills edit does not re-embed. Fingerprints and output sizes/mtimes
+    are recorded per stage in pipeline.manifest.
+  - A stage is skipped when its fingerprint matches, its outputs are untouched and
+    (fetch only) its last run is younger than pipeline.fetch_max_age_hours.
+    A nightly run therefore re-fetches, and stops there if the jobs did not change.
+  - A failed stage blocks its dependents; the others still run.
+  - Prints a per-stage status/timing summary at the end.
+  - --profile (or MATCHER_PROFILE=1) profiles each stage that runs (src/profiling.py);
+    stages then run one at a time so their CPU and memory numbers stay separate.
+Config: pipeline.manifest, pipeline.fetch_max_age_hours, pipeline.max_workers
+Usage: python -m src.pipeline [--role Any] [--force clean embed | --force all] [--dry-run] [--profile]
+"""
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.config import load_config, get_limits, get_pipeline_config
+from src.profiling import profile_stage, profiling_enabled, enable_profiling, start_run
+
+RAW_PATH   = Path("data/jobs/jobs_raw.json")
+CLEAN_PATH = Path("data/jobs/jobs_clean.json")
+VEC_PATH   = Path("data/index/job_vectors.npy")
+
+
+class Stage:
+    def __init__(self, name, run, deps=(), inputs=(), outputs=(), config_keys=(), code=(),
+                 extra=None, max_age_hours=None):
+        self.name          = name
+        self.run           = run            # callable, no arguments
+        self.deps          = tuple(deps)
+        self.inputs        = tuple(inputs)  # files hashed into the fingerprint
+        self.outputs       = outputs        # list of paths, or callable returning one
+        self.config_keys   = tuple(config_keys)
+        self.code          = tuple(code)
+        self.extra         = extra          # callable -> extra fingerprint data
+        self.max_age_hours = max_age_hours
+
+    def output_paths(self):
+        return [Path(p) for p in (self.outputs() if callable(self.outputs) else self.outputs)]
+
+
+# ── Fingerprints ────────────────────────────────────────────────────────────────
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def config_slice(keys):
+    """{"limits.max_job_chars_clean": 2500, "digest": {...}} for dotted keys."""
+    cfg, out = load_config(), {}
+    for key in keys:
+        value = cfg
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        out[key] = value
+    return out
+
+
+def stage_fingerprint(stage):
+    """Returns (parts, digest). Raises FileNotFoundError if an input is missing."""
+    parts = {
+        "inputs": {str(p): file_hash(p) for p in stage.inputs},
+        "config": text_hash(json.dumps(config_slice(stage.config_keys), sort_keys=True)),
+        "code":   {str(p): file_hash(p) for p in stage.code},
+    }
+    if stage.extra is not None:
+        parts["extra"] = stage.extra()
+    return parts, text_hash(json.dumps(parts, sort_keys=True))
+
+
+def output_stats(stage):
+    stats = {}
+    for p in stage.output_paths():
+        st = p.stat()
+        stats[str(p)] = [st.st_size, st.st_mtime_ns]
+    return stats
+
+
+def stale_reason(stage, record, parts, fingerprint):
+    """Why the stage has to run, or None if it is up to date."""
+    if record is None:
+        return "never run"
+    missing = [str(p) for p in stage.output_paths() if not p.exists()]
+    if missing:
+        return f"missing {missing[0]}"
+    if record.get("fingerprint") != fingerprint:
+        changed = [k for k in ("inputs", "config", "code", "extra")
+                   if record.get("parts", {}).get(k) != parts.get(k)]
+        return f"{'/'.join(changed) or 'fingerprint'} changed"
+    if record.get("outputs") != output_stats(stage):
+        return "outputs modified"
+    if stage.max_age_hours is not None:
+        age_h = (time.time() - record.get("finished_at_ts", 0)) / 3600
+        if age_h > stage.max_age_hours:
+            return f"older than {stage.max_age_hours:g}h"
+    return None
+
+
+# ── Stages ──────────────────────────────────────────────────────────────────────
+def _embed_texts_hash():
+    # Only the embedded strings matter, not the digest/tags in jobs_clean.json
+    from src.embed_jobs import job_texts
+    jobs = json.loads(CLEAN_PATH.read_text(encoding="utf-8"))
+    max_chars = int(get_limits().get("max_resume_chars_embed", 1100))
+    return text_hash("\x00".join(job_texts(jobs, max_chars)))
+
+
+def _index_outputs():
+    if int(get_limits().get("index_shards", 1)) > 1:
+        from src.sharded_index import MANIFEST_PATH
+        return [MANIFEST_PATH]
+    from src.build_faiss_index import INDEX_PATH
+    return [INDEX_PATH]
+
+
+def _run_fetch(role):
+    from src.fetch_jobs import main
+    main(preferred_role=role)
+
+
+def _run_clean():
+    from src.clean_jobs import main
+    main(skills=False)
+
+
+def _run_skills():
+    from src.clean_jobs import build_skills
+    build_skills()
+
+
+def _run_store():
+    from src.embed_jobs import write_store
+    write_store()
+
+
+def _run_embed():
+    from src.embed_jobs import main
+    main(store=False)
+
+
+def _run_index():
+    from src.build_faiss_index import main
+    main()
+
+
+def default_stages(role="Any", fetch_max_age_hours=None):
+    from src.skill_index import SKILL_BITS_PATH, SKILL_VOCAB_PATH
+    from src.job_store import STORE_PATH
+    return [
+        Stage("fetch", lambda: _run_fetch(role), outputs=[RAW_PATH],
+              config_keys=["job_api", "limits.num_jobs_fetch", "roles"],
+              code=["src/fetch_jobs.py"], extra=lambda: {"role": role},
+              max_age_hours=fetch_max_age_hours),
+        Stage("clean", _run_clean, deps=["fetch"], inputs=[RAW_PATH], outputs=[CLEAN_PATH],
+              config_keys=["limits.max_job_chars_clean", "noise_patterns", "digest"],
+              code=["src/clean_jobs.py"]),
+        Stage("skills", _run_skills, deps=["clean"], inputs=[CLEAN_PATH],
+              outputs=[SKILL_BITS_PATH, SKILL_VOCAB_PATH], config_keys=["skills"],
+              code=["src/clean_jobs.py", "src/skill_index.py"]),
+        Stage("store", _run_store, deps=["clean"], inputs=[CLEAN_PATH], outputs=[STORE_PATH],
+              code=["src/embed_jobs.py", "src/job_store.py"]),
+        Stage("embed", _run_embed, deps=["clean"], outputs=[VEC_PATH],
+              config_keys=["models.embed_model", "onnx_backend"],
+              code=["src/embed_jobs.py", "src/embedder.py", "src/onnx_embedder.py"],
+              extra=_embed_texts_hash),
+        Stage("index", _run_index, deps=["embed"], inputs=[VEC_PATH], outputs=_index_outputs,
+              config_keys=["limits.index_shards"],
+              code=["src/build_faiss_index.py", "src/sharded_index.py"]),
+    ]
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────────
+def load_manifest(path):
+    path = Path(path)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def save_manifest(manifest, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def execute_stage(stage, record, force=False):
+    """Runs stage if stale. Returns (result row, new manifest record or None)."""
+    t0 = time.perf_counter()
+    try:
+        parts, fingerprint = stage_fingerprint(stage)
+        reason = "forced" if force else stale_reason(stage, record, parts, fingerprint)
+        if reason is None:
+            return {"status": "skipped", "seconds": time.perf_counter() - t0, "reason": "up to date"}, None
+        print(f"\n[{stage.name}] running ({reason})")
+        with profile_stage(stage.name):
+            stage.run()
+        new_record = {
+            "fingerprint":    fingerprint,
+            "parts":          parts,
+            "outputs":        output_stats(stage),
+            "seconds":        round(time.perf_counter() - t0, 3),
+            "finished_at":    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "finished_at_ts": time.time(),
+        }
+        return {"status": "ran", "seconds": time.perf_counter() - t0, "reason": reason}, new_record
+    except Exception as e:
+        print(f"\n[{stage.name}] FAILED: {e!r}")
+        return {"status": "failed", "seconds": time.perf_counter() - t0, "reason": repr(e)}, None
+
+
+def run_pipeline(stages, manifest_path, force=(), max_workers=3):
+    manifest = load_manifest(manifest_path)
+    force    = set(s.name for s in stages) if "all" in force else set(force)
+    pending  = {s.name: s for s in stages}
+    results, running = {}, {}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(d in pending or d in running.values() for d in stage.deps):
+                    continue
+                del pending[name]
+                failed = [d for d in stage.deps if results[d]["status"] in ("failed", "blocked")]
+                if failed:
+                    results[name] = {"status": "blocked", "seconds": 0.0, "reason": f"{failed[0]} did not finish"}
+                    continue
+                running[pool.submit(execute_stage, stage, manifest.get(name), name in force)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                results[name], record = fut.result()
+                if record is not None:
+                    manifest[name] = record
+                    save_manifest(manifest, manifest_path)
+    print_summary(stages, results, time.perf_counter() - t0)
+    return results
+
+
+def print_summary(stages, results, total):
+    print("\n=== Pipeline summary ===")
+    print(f"{'stage':<8} {'status':<8} {'seconds':>8}  reason")
+    for s in stages:
+        r = results[s.name]
+        print(f"{s.name:<8} {r['status']:<8} {r['seconds']:>8.2f}  {r['reason']}")
+    print(f"{'total':<8} {'':<8} {total:>8.2f}")
+
+
+def dry_run(stages, manifest_path, force=()):
+    """Status of every stage against the files on disk now (upstream reruns not simulated)."""
+    manifest = load_manifest(manifest_path)
+    for s in stages:
+        try:
+            parts, fingerprint = stage_fingerprint(s)
+            reason = "forced" if (s.name in force or "all" in force) else \
+                stale_reason(s, manifest.get(s.name), parts, fingerprint)
+        except FileNotFoundError as e:
+            reason = f"input missing ({e.filename})"
+        print(f"{s.name:<8} {'would run' if reason else 'up to date':<11} {reason or ''}")
+
+
+def main(role="Any", force=(), workers=None, dry=False, profile=False):
+    cfg = get_pipeline_config()
+    if profile:
+        enable_profiling()
+    manifest_path = cfg.get("manifest", "data/pipeline_manifest.json")
+    stages = default_stages(role, cfg.get("fetch_max_age_hours"))
+    if dry:
+        dry_run(stages, manifest_path, force)
+        return {}
+    # tracemalloc is process-wide, so profiled stages must not overlap
+    max_workers = int(workers or cfg.get("max_workers", 3))
+    if profiling_enabled():
+        start_run("pipeline")
+        max_workers = 1
+    results = run_pipeline(stages, manifest_path, force, max_workers=max_workers)
+    if any(r["status"] in ("failed", "blocked") for r in results.values()):
+        raise SystemExit(1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--role", default="Any")
+    parser.add_argument("--force", nargs="*", default=[], help="stage names to rerun, or 'all'")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to pipeline.max_workers")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run, run nothing")
+    parser.add_argument("--profile", action="store_true", help="CPU/memory profile per stage")
+    args = parser.parse_args()
+    main(args.role, args.force, args.workers, args.dry_run, args.profile)
@@ -0,0 +1,115 @@
+"""
+prefetch.py - Speculative matching that starts as soon as a resume is uploaded.
+  - On upload, a background thread extracts the text, embeds the resume, runs
+    retrieval for the selected role and top_k and, if prefetch.score_top1 is on
+    (off by default: it spends an LLM call even if the user never clicks),
+    scores the #1 candidate with the LLM. A failed score is not kept, so the
+    main run retries it.
+  - The work is done inside a ResultSession. When "Find My Best Jobs" is pressed,
+    adopt_prefetch() hands that session to the main run: the text and query vector
+    are already in resume_cache, the hits are in session.matches and the #1 job is
+    in session.scored, so only the remaining work happens after the click.
+  - A prefetch belongs to one (upload content, role). A new upload or role
+    cancels it; the old thread stops at its next step and its results are dropped.
+Config: prefetch.enabled, prefetch.score_top1, prefetch.wait_seconds
+"""
+import time
+import threading
+
+from src.resume_cache import content_hash, get_resume_text
+from src.session_results import ResultSession
+
+MIN_RESUME_CHARS = 100
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class Prefetch:
+    def __init__(self, data, suffix, preferred_role, top_k, index, meta, clean_jobs,
+                 embed_client=None, score_client=None):
+        self.key          = (content_hash(data), preferred_role)
+        self.session      = None
+        self.error        = None
+        self.adopted      = False
+        self.timings      = {}
+        self._cancelled   = threading.Event()
+        self._done        = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(data, suffix, preferred_role, top_k, index, meta, clean_jobs, embed_client, score_client),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _step(self, name, fn):
+        if self._cancelled.is_set():
+            raise _Cancelled()
+        t0 = time.perf_counter()
+        out = fn()
+        self.timings[name] = time.perf_counter() - t0
+        return out
+
+    def _run(self, data, suffix, preferred_role, top_k, index, meta, clean_jobs, embed_client, score_client):
+        try:
+            text = self._step("extract", lambda: get_resume_text(data, suffix))
+            if len(text.strip()) < MIN_RESUME_CHARS:
+                return
+            session = ResultSession(text, preferred_role, index, meta, clean_jobs, embed_client)
+            matches = self._step("retrieve", lambda: session.matches(top_k))
+            if matches and score_client is not None:
+                self._step("score_top1", lambda: session.score(matches, 1, score_client))
+            if not self._cancelled.is_set():
+                self.session = session
+        except _Cancelled:
+            pass
+        except Exception as e:
+            # Speculative only: the main run redoes whatever failed here
+            self.error = e
+        finally:
+            self._done.set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+def start_prefetch(store, data, suffix, preferred_role, top_k, index, meta, clean_jobs,
+                   embed_client=None, score_client=None, slot="prefetch"):
+    """Starts a prefetch for this upload + role unless one is already held in store
+    (e.g. st.session_state). A prefetch for anything else is cancelled and replaced."""
+    current = store.get(slot)
+    if current is not None and current.key == (content_hash(data), preferred_role):
+        return current
+    if current is not None:
+        current.cancel()
+    store[slot] = Prefetch(data, suffix, preferred_role, top_k, index, meta, clean_jobs,
+                           embed_client, score_client)
+    return store[slot]
+
+
+def discard_prefetch(store, slot="prefetch"):
+    current = store.pop(slot, None)
+    if current is not None:
+        current.cancel()
+
+
+def adopt_prefetch(store, timeout=None, slot="prefetch", session_slot="result_session"):
+    """Waits up to timeout for the prefetch and installs its ResultSession in store.
+    Returns the Prefetch if its work was handed over, else None."""
+    current = store.get(slot)
+    if current is None or current.adopted or not current.wait(timeout):
+        return None
+    current.adopted = True
+    session = current.session
+    if session is None:
+        return None
+    existing = store.get(session_slot)
+    if existing is not None and existing.key == session.key:
+        # The session from an earlier run already holds this work (and maybe more)
+        return None
+    store[session_slot] = session
+    return current
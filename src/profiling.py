@@ -0,0 +1,215 @@
+"""
+profiling.py - Built-in CPU and memory profiling for pipeline stages and requests.
+  - Off by default. Turned on by profiling.enabled, MATCHER_PROFILE=1, the
+    pipeline's --profile flag, or per request by the app's debug toggle.
+  - Each profiled stage records a cProfile profile, the top tracemalloc
+    allocation sites, wall/CPU time, peak traced memory and the process's peak
+    RSS so far. tracemalloc is process-wide: stages that overlap (two sessions,
+    the prefetch thread) share one trace, which stops when the last one exits.
+  - Output goes to <profiling.out_dir>/<timestamp>-<label>/:
+      NN-<stage>.prof   raw pstats (open with snakeviz or pstats)
+      NN-<stage>.txt    hot functions + allocation sites for that stage
+      summary.txt       one line per stage + its hottest functions
+  - clean_jobs.main, embed_jobs.main, match_resume_to_jobs, score_top_jobs, etc.
+    are wrapped with @profiled(...). Nested stages fold into the outer one, so a
+    pipeline run gets one entry per pipeline stage.
+Config: profiling.enabled, profiling.out_dir, profiling.top_n, profiling.traceback_frames
+"""
+import io
+import sys
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+
+from src.config import get_profiling_config
+
+_tls   = threading.local()
+_state = {"forced": False, "run": None}
+_trace = {"users": 0, "ours": False}   # tracemalloc is process-wide: refcount the stages using it
+_lock  = threading.Lock()
+
+
+def enable_profiling():
+    """Turns profiling on for this process (e.g. from a --profile flag)."""
+    _state["forced"] = True
+
+
+def profiling_enabled():
+    return _state["forced"] or bool(get_profiling_config().get("enabled"))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except Exception:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KB on Linux
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def _short_path(filename):
+    parts = Path(filename).parts
+    return "/".join(parts[-2:]) if len(parts) > 1 else filename
+
+
+def hot_functions(prof, top_n, sort="tottime"):
+    """[{function, calls, tottime, cumtime}] from a cProfile.Profile, hottest first."""
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in pstats.Stats(prof).stats.items():
+        where = func if filename == "~" else f"{func} ({_short_path(filename)}:{line})"
+        rows.append({"function": where, "calls": ncalls, "tottime": tottime, "cumtime": cumtime})
+    rows.sort(key=lambda r: r[sort], reverse=True)
+    return rows[:top_n]
+
+
+def allocation_sites(snapshot, top_n):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    return [{"site": f"{_short_path(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+             "size_kb": s.size / 1024, "count": s.count}
+            for s in snapshot.statistics("lineno")[:top_n]]
+
+
+class ProfileRun:
+    def __init__(self, label, out_dir=None, top_n=None):
+        cfg = get_profiling_config()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.label  = label
+        self.dir    = Path(out_dir or cfg.get("out_dir", "data/profiles")) / f"{stamp}-{label}"
+        self.top_n  = int(top_n or cfg.get("top_n", 25))
+        self.frames = int(cfg.get("traceback_frames", 1))
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        with _lock:
+            if _trace["users"] == 0:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(self.frames)
+                    _trace["ours"] = True
+                else:
+                    tracemalloc.reset_peak()
+            _trace["users"] += 1
+        prof = cProfile.Profile()
+        _tls.active = True
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            prof.enable()
+        except ValueError:
+            prof = None   # another profiler already owns the interpreter (Python 3.12+)
+        try:
+            yield self
+        finally:
+            if prof is not None:
+                prof.disable()
+            _tls.active = False
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            with _lock:
+                # Overlapping stages (two sessions, prefetch thread) share one trace and peak
+                _, peak_traced = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                _trace["users"] -= 1
+                if _trace["users"] == 0 and _trace["ours"]:
+                    tracemalloc.stop()
+                    _trace["ours"] = False
+            self._record(name, prof, snapshot, wall, cpu, peak_traced)
+
+    def _record(self, name, prof, snapshot, wall, cpu, peak_traced):
+        entry = {
+            "stage":          name,
+            "wall_s":         wall,
+            "cpu_s":          cpu,
+            "peak_traced_mb": peak_traced / 2**20,
+            "peak_rss_mb":    peak_rss_mb(),
+            "hot":            hot_functions(prof, self.top_n) if prof is not None else [],
+            "allocations":    allocation_sites(snapshot, self.top_n),
+        }
+        with _lock:
+            self.stages.append(entry)
+            self.dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{len(self.stages):02d}-{name}"
+            if prof is not None:
+                prof.dump_stats(str(self.dir / f"{stem}.prof"))
+            (self.dir / f"{stem}.txt").write_text(self._stage_report(entry, prof), encoding="utf-8")
+            (self.dir / "summary.txt").write_text(self.summary(), encoding="utf-8")
+        print(f"  Profile [{name}]: {wall:.2f}s wall, {cpu:.2f}s CPU -> {self.dir / (stem + '.txt')}")
+
+    def _stage_report(self, entry, prof):
+        out = io.StringIO()
+        out.write(f"{_stage_line(entry)}\n\n== Hottest functions (self time) ==\n")
+        out.write(_hot_table(entry["hot"]))
+        out.write("\n== Top allocation sites (live at stage end) ==\n")
+        for a in entry["allocations"]:
+            out.write(f"{a['size_kb']:>10.1f} KB {a['count']:>8} blocks  {a['site']}\n")
+        if prof is not None:
+            out.write("\n== Cumulative view ==\n")
+            pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(self.top_n)
+        return out.getvalue()
+
+    def summary(self, per_stage=10):
+        lines = [f"Profile run: {self.label}", ""]
+        lines += [_stage_line(e) for e in self.stages]
+        for e in self.stages:
+            lines += ["", f"== {e['stage']}: hottest functions ==", _hot_table(e["hot"][:per_stage]).rstrip()]
+        return "\n".join(lines) + "\n"
+
+
+def _stage_line(e):
+    rss = f"{e['peak_rss_mb']:.0f} MB" if e["peak_rss_mb"] is not None else "n/a"
+    return (f"{e['stage']:<12} wall {e['wall_s']:>7.2f}s  cpu {e['cpu_s']:>7.2f}s  "
+            f"peak traced {e['peak_traced_mb']:>7.1f} MB  peak RSS {rss}")
+
+
+def _hot_table(rows):
+    out = [f"{'self s':>8} {'cum s':>8} {'calls':>9}  function"]
+    out += [f"{r['tottime']:>8.3f} {r['cumtime']:>8.3f} {r['calls']:>9}  {r['function']}" for r in rows]
+    return "\n".join(out) + "\n"
+
+
+def start_run(label):
+    """Starts a fresh process-wide run, e.g. one directory for a whole pipeline run."""
+    with _lock:
+        _state["run"] = ProfileRun(label)
+        return _state["run"]
+
+
+def _process_run(label):
+    with _lock:
+        if _state["run"] is None:
+            _state["run"] = ProfileRun(label)
+        return _state["run"]
+
+
+@contextmanager
+def profile_stage(name, run=None):
+    """Profiles the block as one stage of run, or of this process's run when profiling
+    is enabled. No-op when profiling is off or a stage is already active in this thread."""
+    if getattr(_tls, "active", False) or (run is None and not profiling_enabled()):
+        yield None
+        return
+    with (run or _process_run(name)).stage(name) as active_run:
+        yield active_run
+
+
+def profiled(name):
+    """Decorator form of profile_stage(name)."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with profile_stage(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
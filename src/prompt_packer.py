@@ -0,0 +1,82 @@
+"""
+prompt_packer.py - Token-budget-aware inputs for the score_job prompt.
+  - Counts tokens with the chat model's real tokenizer (models.prompt_tokenizer),
+    falling back to a ~4 chars/token estimate when transformers is unavailable.
+  - The job side leads with its digest (requirements/skills sections extracted
+    by clean_jobs.py) and only then the rest of clean_text, so the parts that
+    matter for scoring are never the ones cut off.
+  - Resume and job share limits.prompt_token_budget: the resume gets
+    limits.prompt_resume_share of it, and whichever side is shorter hands its
+    unused tokens to the other, so the budget is filled exactly.
+  - Off by default (prompt_token_budget 0): the fixed max_*_chars_prompt cuts apply.
+    With transformers installed, the first packed call downloads the tokenizer
+    from the HF Hub; set models.prompt_tokenizer to "" to use the estimate instead.
+Config: limits.prompt_token_budget, limits.prompt_resume_share, models.prompt_tokenizer
+"""
+from threading import Lock
+
+from src.config import get_models
+
+_tokenizer_cache = {}
+_lock = Lock()
+
+
+class _CharTokenizer:
+    """Fallback: 4-character chunks stand in for tokens."""
+
+    def encode(self, text):
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def decode(self, ids):
+        return "".join(ids)
+
+
+class _HFTokenizer:
+    def __init__(self, name):
+        from transformers import AutoTokenizer
+        self._tok = AutoTokenizer.from_pretrained(name)
+
+    def encode(self, text):
+        return self._tok.encode(text, add_special_tokens=False)
+
+    def decode(self, ids):
+        return self._tok.decode(ids, skip_special_tokens=True)
+
+
+def get_tokenizer(name=None):
+    name = name if name is not None else (get_models().get("prompt_tokenizer") or "")
+    with _lock:
+        if name not in _tokenizer_cache:
+            try:
+                _tokenizer_cache[name] = _HFTokenizer(name) if name else _CharTokenizer()
+            except Exception as e:
+                print(f"  Tokenizer '{name}' unavailable ({e}); using ~4 chars/token estimate.")
+                _tokenizer_cache[name] = _CharTokenizer()
+        return _tokenizer_cache[name]
+
+
+def count_tokens(text, tokenizer=None):
+    return len((tokenizer or get_tokenizer()).encode(text or ""))
+
+
+def job_prompt_text(job):
+    """Digest first, then the remaining clean_text as extra context."""
+    clean  = (job.get("clean_text") or "").strip()
+    digest = (job.get("digest") or "").strip()
+    if not digest:
+        return clean
+    description = clean.split("Description:", 1)[-1].strip()
+    return f"{digest}\nMore details: {description}" if description else digest
+
+
+def pack_score_inputs(prompt_template, resume_text, job, token_budget, resume_share=0.45,
+                      tokenizer=None):
+    """Returns (resume_part, job_part) that together with the template fit token_budget."""
+    tok = tokenizer or get_tokenizer()
+    fixed = count_tokens(prompt_template.format(resume_text="", job_text=""), tok)
+    avail = max(0, int(token_budget) - fixed)
+    resume_ids = tok.encode((resume_text or "").strip())
+    job_ids    = tok.encode(job_prompt_text(job))
+    resume_quota = min(len(resume_ids), max(int(avail * resume_share), avail - len(job_ids)))
+    job_quota    = max(0, avail - resume_quota)
+    return tok.decode(resume_ids[:resume_quota]), tok.decode(job_ids[:job_quota])
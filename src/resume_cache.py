@@ -0,0 +1,94 @@
+"""
+resume_cache.py - Content-hash keyed LRU cache for uploaded resumes.
+  - Extracted text is cached per uploaded file (sha256 of the raw bytes).
+  - Query vectors are cached per (trimmed resume text, embed model).
+
+A second run on the same resume (e.g. only the role or top_k changed) skips
+both PDF parsing and embedding.
+Config: limits.resume_cache_size
+"""
+import hashlib
+import io
+from collections import OrderedDict
+from threading import Lock
+
+from src.config import get_limits
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping. Streamlit sessions run on separate threads."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, int(max_size))
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_size        = int(get_limits().get("resume_cache_size", 32))
+_text_cache  = LRUCache(_size)
+_vec_cache   = LRUCache(_size)
+
+
+def content_hash(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def extract_text_from_bytes(data: bytes, suffix: str) -> str:
+    """Extract resume text from in-memory bytes. No temp file round trip."""
+    suffix = suffix.lower()
+    if suffix == ".txt":
+        return data.decode("utf-8", errors="replace")
+    if suffix == ".pdf":
+        from pypdf import PdfReader
+        reader = PdfReader(io.BytesIO(data))
+        return "\n".join(p.extract_text() or "" for p in reader.pages)
+    raise ValueError(f"Unsupported file type: {suffix}. Upload a .pdf or .txt file.")
+
+
+def get_resume_text(data: bytes, suffix: str) -> str:
+    """Cached extract_text_from_bytes, keyed by the upload's content hash."""
+    key  = (content_hash(data), suffix.lower())
+    text = _text_cache.get(key)
+    if text is None:
+        text = extract_text_from_bytes(data, suffix)
+        _text_cache.put(key, text)
+    return text
+
+
+def get_resume_vector(trimmed_text: str, embed_model: str, client=None):
+    """Cached embed_one for the resume query. Returns a 1-D float32 array."""
+    from src.embedder import embed_one
+    key = (content_hash(trimmed_text), embed_model)
+    vec = _vec_cache.get(key)
+    if vec is None:
+        vec = embed_one(trimmed_text, embed_model, client)
+        _vec_cache.put(key, vec)
+    return vec.copy()
+
+
+def clear_resume_cache():
+    _text_cache.clear()
+    _vec_cache.clear()
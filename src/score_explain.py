@@ -1,5 +1,6 @@
 import os, re
 from pathlib import Path
+from src.profiling import profiled
 
 OUT_DIR  = Path("data/cache")
 OUT_PATH = OUT_DIR / "scored_matches.json"
@@ -57,6 +58,7 @@ def score_job(resume_text, job_text, client, prompt_template, fields,
                     ([] if k in ("matched_skills","missing_skills","recommendations") else ""))
                  for k in fields}
         empty["summary"] = f"LLM error: {e}"
+        empty["error"]   = True   # placeholder: callers must not cache it
         return empty
     if debug:
         print(f"  RAW: {repr(raw[:300])}")
@@ -64,7 +66,106 @@ def score_job(resume_text, job_text, client, prompt_template, fields,
     result["raw_llm_output"] = raw
     return result
 
-def score_top_jobs(resume_text, matches, client, top_n=None, debug=False):
+JOB_HEADER_RE = re.compile(r"^JOB\s*(\d+)\s*[:.)\-]?\s*$")
+
+def estimate_tokens(text):
+    # ~4 chars per token for English prose; only used to size batches
+    return len(text or "") // 4 + 1
+
+def split_job_blocks(raw):
+    blocks, current = {}, None
+    for line in (raw or "").strip().splitlines():
+        clean = re.sub(r"[*`#]+", "", line).strip()
+        m = JOB_HEADER_RE.match(clean.upper())
+        if m:
+            current = int(m.group(1))
+            blocks[current] = []
+        elif current is not None and clean:
+            blocks[current].append(line)
+    return {n: "\n".join(lines) for n, lines in blocks.items()}
+
+def parse_batch_output(raw, fields, num_jobs):
+    """Returns {job_number: result} for every complete block.
+    Blocks missing a field or a numeric fit score are left out so the caller can re-score them."""
+    score_key = fields.get("fit_score", "FIT_SCORE")
+    parsed = {}
+    for n, block in split_job_blocks(raw).items():
+        lines = block.splitlines()
+        if not 1 <= n <= num_jobs:
+            continue
+        if not re.search(r"\d", grab(lines, score_key)):
+            continue
+        if not all(grab(lines, key) for key in fields.values()):
+            continue
+        result = parse_kv_output(block, fields)
+        result["raw_llm_output"] = block
+        parsed[n] = result
+    return parsed
+
+def plan_batches(job_texts, fixed_tokens, out_tokens_per_job, token_budget, max_jobs):
+    """Greedily groups job indices so each call's prompt + completion fits token_budget."""
+    batches, current, used = [], [], fixed_tokens
+    for i, text in enumerate(job_texts):
+        cost = estimate_tokens(text) + out_tokens_per_job + 4
+        if current and (used + cost > token_budget or len(current) >= max_jobs):
+            batches.append(current)
+            current, used = [], fixed_tokens
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def score_job_batch(resume_text, job_texts, client, prompt_template, fields,
+                    model, max_tokens_per_job, max_resume_chars, max_job_chars, debug=False):
+    """Scores several jobs in one call. Returns a list aligned with job_texts;
+    entries are None where the block could not be parsed (or the call failed)."""
+    jobs_text = "\n\n".join(f"JOB {i}:\n{trim(t, max_job_chars)}"
+                             for i, t in enumerate(job_texts, start=1))
+    prompt = prompt_template.format(
+        num_jobs=len(job_texts),
+        resume_text=trim(resume_text, max_resume_chars),
+        jobs_text=jobs_text,
+    )
+    try:
+        resp = client.chat.completions.create(
+            model=model, messages=[{"role": "user", "content": prompt}],
+            temperature=0.0, max_tokens=max_tokens_per_job * len(job_texts),
+        )
+        raw = resp.choices[0].message.content or ""
+    except Exception as e:
+        print(f"  Batch LLM error: {e}. Falling back to single-job calls.")
+        return [None] * len(job_texts)
+    if debug:
+        print(f"  RAW: {repr(raw[:600])}")
+    parsed = parse_batch_output(raw, fields, len(job_texts))
+    return [parsed.get(n) for n in range(1, len(job_texts) + 1)]
+
+def _score_batched(resume_text, jobs, client, limits, model, max_tokens,
+                   max_resume_chars, max_job_chars, debug=False):
+    from src.config import load_prompt, get_prompt_fields
+    prompt_template = load_prompt("score_jobs_batch")
+    fields          = get_prompt_fields("score_jobs_batch")
+    token_budget    = int(limits.get("batch_token_budget", 6000))
+    max_jobs        = int(limits.get("batch_max_jobs", 5))
+    job_texts = [trim(j.get("clean_text", ""), max_job_chars) for j in jobs]
+    fixed     = estimate_tokens(prompt_template) + estimate_tokens(trim(resume_text, max_resume_chars))
+    results   = [None] * len(jobs)
+    for batch in plan_batches(job_texts, fixed, max_tokens, token_budget, max_jobs):
+        if len(batch) < 2:
+            continue
+        print(f"  Scoring batch of {len(batch)} jobs ...")
+        parsed = score_job_batch(
+            resume_text, [job_texts[i] for i in batch], client,
+            prompt_template, fields, model, max_tokens,
+            max_resume_chars, max_job_chars, debug=debug,
+        )
+        for i, result in zip(batch, parsed):
+            results[i] = result
+    return results
+
+@profiled("score_top_jobs")
+def score_top_jobs(resume_text, matches, client, top_n=None, debug=False, batch=None, packed=None):
     from src.config import get_models, get_limits, load_prompt, get_prompt_fields
     limits = get_limits()
     models = get_models()
@@ -76,16 +177,39 @@ def score_top_jobs(resume_text, matches, client, top_n=None, debug=False):
     max_job_chars    = int(limits.get("max_job_chars_prompt", 1500))
     prompt_template  = load_prompt("score_job")
     fields           = get_prompt_fields("score_job")
-    scored = []
-    for job in matches[:top_n]:
-        title   = job.get("title", "?")
-        company = job.get("company", "?")
-        print(f"  Scoring: {title} @ {company} ...")
-        result = score_job(
-            resume_text, job.get("clean_text", ""), client,
-            prompt_template, fields, model, max_tokens,
+    token_budget     = int(limits.get("prompt_token_budget", 0))
+    resume_share     = float(limits.get("prompt_resume_share", 0.45))
+    if packed is None:
+        packed = token_budget > 0
+    if batch is None:
+        batch = bool(limits.get("batch_scoring", False))
+    targets = matches[:top_n]
+    results = [None] * len(targets)
+    if batch and len(targets) > 1:
+        results = _score_batched(
+            resume_text, targets, client, limits, model, max_tokens,
             max_resume_chars, max_job_chars, debug=debug,
         )
+    scored = []
+    for job, result in zip(targets, results):
+        if result is None:
+            title   = job.get("title", "?")
+            company = job.get("company", "?")
+            print(f"  Scoring: {title} @ {company} ...")
+            resume_part, job_part = resume_text, job.get("clean_text", "")
+            resume_chars, job_chars = max_resume_chars, max_job_chars
+            if packed:
+                # Token-budgeted inputs (digest first) replace the fixed character cuts
+                from src.prompt_packer import pack_score_inputs
+                resume_part, job_part = pack_score_inputs(
+                    prompt_template, resume_text, job, token_budget or 768, resume_share,
+                )
+                resume_chars, job_chars = len(resume_part), len(job_part)
+            result = score_job(
+                resume_part, job_part, client,
+                prompt_template, fields, model, max_tokens,
+                resume_chars, job_chars, debug=debug,
+            )
         if debug:
             print(f"    fit_score={result.get(chr(102)+chr(105)+chr(116)+chr(95)+chr(115)+chr(99)+chr(111)+chr(114)+chr(101))}")
         enriched = {**job, **result, "rank": len(scored) + 1}
@@ -0,0 +1,93 @@
+"""
+session_results.py - Per-session result state so slider changes cost only the delta.
+  - FAISS hits, their metadata, clean_text and skill gaps are kept per session.
+    Widening top_k re-runs the FAISS search with the larger k (a flat index
+    cannot resume a search) and keeps the earlier hits; only the new hits have
+    their metadata, clean_text and skill gaps looked up. The resume is not re-embedded.
+  - LLM scores are kept per job row. Raising top_n scores only the jobs that
+    were not scored before; lowering it re-uses what is there.
+  - The state is keyed by (resume text, role, embed model, index); any change
+    to those starts a fresh session state.
+"""
+from src.config import get_models
+from src.resume_cache import content_hash
+from src.match_jobs import (embed_resume_query, search_hits, fetch_meta, select_matches,
+                            fill_clean_text, attach_skill_gaps)
+
+
+def session_key(resume_text, preferred_role, index):
+    return (content_hash(resume_text), preferred_role, get_models()["embed_model"], id(index))
+
+
+class ResultSession:
+    def __init__(self, resume_text, preferred_role, index, meta, clean_jobs, client=None):
+        self.key            = session_key(resume_text, preferred_role, index)
+        self.resume_text    = resume_text
+        self.preferred_role = preferred_role
+        self.index          = index
+        self.meta           = meta
+        self.clean_jobs     = clean_jobs
+        self.client         = client
+        self._vec           = None
+        self.hits           = []   # [(score, idx)] in FAISS order
+        self.metas          = {}   # idx -> meta for the hits found in the store
+        self.searched_k     = 0
+        self._details       = {}   # idx -> {"clean_text", "digest", "matched_skills", "missing_skills"}
+        self.scored         = {}   # idx -> scored job dict
+
+    def matches(self, top_k):
+        """Same result as match_resume_to_jobs, extending the cached search if needed."""
+        want_k = min(top_k * 3, self.index.ntotal)
+        if want_k > self.searched_k:
+            if self._vec is None:
+                self._vec = embed_resume_query(self.resume_text, self.client)
+            # Full search with the larger k (flat index, no resume); the results are exact, so
+            # the first searched_k hits are unchanged and only the new tail is kept and looked up
+            seen = {idx for _, idx in self.hits}
+            new_hits = [h for h in search_hits(self._vec, self.index, self.meta, want_k) if h[1] not in seen]
+            self.hits  += new_hits
+            self.metas.update(fetch_meta(self.meta, [idx for _, idx in new_hits]))
+            self.searched_k = want_k
+
+        # A fresh call only sees its own top_k*3 candidates: after a wider search, narrowing
+        # must not let the role filter/fallback reach into the extra hits
+        n = min(top_k * 3, len(self.hits))
+        results = select_matches(self.hits[:n], self.metas, self.preferred_role, top_k)
+        fresh = [r for r in results if r["idx"] not in self._details]
+        if fresh:
+            fill_clean_text(fresh, self.clean_jobs)
+            attach_skill_gaps(fresh, self.resume_text, self.meta)
+            for r in fresh:
+                self._details[r["idx"]] = {k: r[k] for k in ("clean_text", "digest", "matched_skills", "missing_skills")
+                                           if k in r}
+        return [{**r, **self._details[r["idx"]]} for r in results]
+
+    def score(self, matches, top_n, client, cascade=False):
+        """Scores matches[:top_n], calling the LLM only for jobs not scored yet."""
+        from src.score_explain import score_top_jobs
+        if cascade:
+            from src.cascade import cascade_score_jobs
+            return cascade_score_jobs(self.resume_text, matches, client, top_n=top_n,
+                                      scored_cache=self.scored)
+        targets = matches[:top_n]
+        new = [m for m in targets if m["idx"] not in self.scored]
+        fresh = {}
+        if new:
+            for job in score_top_jobs(self.resume_text, new, client, top_n=len(new)):
+                fresh[job["idx"]] = job
+                # Failed calls ("LLM error" placeholders) are shown once, then retried
+                if not job.get("error"):
+                    self.scored[job["idx"]] = job
+        return [{**(self.scored.get(m["idx"]) or fresh[m["idx"]]), "rank": rank}
+                for rank, m in enumerate(targets, start=1)]
+
+
+def get_result_session(store, resume_text, preferred_role, index, meta, clean_jobs, client=None,
+                       slot="result_session"):
+    """Returns the ResultSession held in store (e.g. st.session_state), replacing it
+    when the resume, role, embed model or index changed."""
+    current = store.get(slot)
+    if current is None or current.key != session_key(resume_text, preferred_role, index):
+        current = ResultSession(resume_text, preferred_role, index, meta, clean_jobs, client)
+        store[slot] = current
+    return current
@@ -0,0 +1,276 @@
+"""
+sharded_index.py - FAISS index split into N shards, each served by its own process.
+  - Build: job row r goes to shard r % N. Each shard is an IndexIDMap over
+    IndexFlatIP holding global row ids, saved as data/index/shards/shard_<i>.index
+    and listed in data/index/shards/manifest.json.
+  - Serve: one worker process per shard. ShardedIndex fans every query out to
+    all shards, then merges the per-shard top-k into a global top-k.
+  - ShardedIndex exposes ntotal and search(vecs, k) like a faiss index, so
+    match_jobs.py uses it unchanged.
+  - Health: ping() per shard; a dead worker is restarted once per query and
+    skipped (partial results) if it still fails.
+  - Reload: search() and health() check the manifest first. A shard whose
+    checksum changed (python -m src.build_faiss_index --rebuild-shard i) is
+    reloaded in place; the other shards are untouched. Workers are stopped at
+    exit or by close().
+Config: limits.index_shards
+"""
+import json
+import time
+import atexit
+import hashlib
+import multiprocessing as mp
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+import faiss
+
+SHARD_DIR     = Path("data/index/shards")
+MANIFEST_PATH = SHARD_DIR / "manifest.json"
+
+
+def shard_rows(n_rows, num_shards, shard_id):
+    return np.arange(shard_id, n_rows, num_shards, dtype=np.int64)
+
+
+def build_shard(vecs, num_shards, shard_id, shard_dir=SHARD_DIR):
+    """Writes one shard file from the full vector matrix; returns its manifest entry."""
+    rows  = shard_rows(len(vecs), num_shards, shard_id)
+    index = faiss.IndexIDMap(faiss.IndexFlatIP(vecs.shape[1]))
+    if len(rows):
+        index.add_with_ids(np.ascontiguousarray(vecs[rows]), rows)
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    path = shard_dir / f"shard_{shard_id}.index"
+    tmp  = path.with_suffix(".index.tmp")
+    faiss.write_index(index, str(tmp))
+    tmp.replace(path)
+    checksum = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    return {"id": shard_id, "file": path.name, "count": int(index.ntotal), "checksum": checksum}
+
+
+def build_shards(vecs, num_shards, shard_dir=SHARD_DIR, only=None):
+    """Builds all shards, or just the ids in `only`, and updates the manifest."""
+    shard_dir = Path(shard_dir)
+    manifest_path = shard_dir / "manifest.json"
+    manifest = {}
+    if only is not None and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("num_shards") != num_shards:
+            raise ValueError(f"Manifest has {manifest.get('num_shards')} shards; rebuild all shards to change N.")
+    entries = {e["id"]: e for e in manifest.get("shards", [])}
+    for shard_id in (range(num_shards) if only is None else only):
+        entries[shard_id] = build_shard(vecs, num_shards, shard_id, shard_dir)
+    manifest = {"num_shards": num_shards, "dim": int(vecs.shape[1]), "ntotal": int(len(vecs)),
+                "shards": [entries[i] for i in sorted(entries)]}
+    tmp = manifest_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp.replace(manifest_path)   # running ShardedIndex instances poll this file
+    return manifest
+
+
+def _shard_worker(path, conn):
+    faiss.omp_set_num_threads(1)
+    index = faiss.read_index(path)
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        op = msg[0]
+        if op == "search":
+            _, vecs, k = msg
+            k = min(k, index.ntotal)
+            if k <= 0:
+                conn.send((np.zeros((len(vecs), 0), "float32"), np.zeros((len(vecs), 0), "int64")))
+            else:
+                conn.send(index.search(vecs, k))
+        elif op == "ping":
+            conn.send(("pong", int(index.ntotal)))
+        elif op == "reload":
+            index = faiss.read_index(path)
+            conn.send(("reloaded", int(index.ntotal)))
+        elif op == "stop":
+            break
+    conn.close()
+
+
+class _Shard:
+    def __init__(self, shard_id, path, ctx):
+        self.id   = shard_id
+        self.path = str(path)
+        self._ctx = ctx
+        self.lock = Lock()
+        self.start()
+
+    def start(self):
+        parent, child = self._ctx.Pipe()
+        self.proc = self._ctx.Process(target=_shard_worker, args=(self.path, child), daemon=True)
+        self.proc.start()
+        child.close()
+        self.conn = parent
+
+    def restart(self):
+        """Kills the worker and starts a new one on a fresh pipe, so a late reply to an
+        abandoned query can never be read as the answer to the next one."""
+        self.proc.terminate()
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()   # hung or stopped: SIGTERM is not enough
+            self.proc.join(timeout=5)
+        self.conn.close()
+        self.start()
+
+    def stop(self):
+        try:
+            self.conn.send(("stop",))
+        except (OSError, EOFError, BrokenPipeError):
+            pass
+        self.proc.join(timeout=2)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join(timeout=2)
+        if self.proc.is_alive():
+            self.proc.kill()
+
+
+class ShardedIndex:
+    def __init__(self, shard_dir=SHARD_DIR, timeout=10.0):
+        self.shard_dir = Path(shard_dir)
+        self.manifest_path = self.shard_dir / "manifest.json"
+        if not self.manifest_path.exists():
+            raise FileNotFoundError(f"Missing {self.manifest_path}. Run: python -m src.build_faiss_index --shards N")
+        self.timeout  = timeout
+        self._ctx     = mp.get_context("spawn")
+        self._refresh_lock = Lock()
+        self.shards   = []
+        self._load_manifest()
+        atexit.register(self.close)
+
+    def _load_manifest(self):
+        self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+        self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        self.ntotal   = int(self.manifest["ntotal"])
+        self.d        = int(self.manifest["dim"])
+        self.close()
+        self.shards = [_Shard(e["id"], self.shard_dir / e["file"], self._ctx) for e in self.manifest["shards"]]
+
+    def refresh(self):
+        """Reloads the shards whose manifest checksum changed since the last check.
+        Returns their ids. A different shard count restarts every worker."""
+        with self._refresh_lock:
+            try:
+                mtime = self.manifest_path.stat().st_mtime_ns
+                if mtime == self._manifest_mtime:
+                    return []
+                manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return []   # mid-rebuild: try again on the next query
+            if manifest.get("num_shards") != self.manifest.get("num_shards"):
+                self._load_manifest()
+                print(f"  Shard layout changed - restarted {len(self.shards)} shard workers.")
+                return [shard.id for shard in self.shards]
+            old = {e["id"]: e.get("checksum") for e in self.manifest["shards"]}
+            changed = [e["id"] for e in manifest["shards"] if e.get("checksum") != old.get(e["id"])]
+            for shard_id in changed:
+                self.reload_shard(shard_id)
+            self._manifest_mtime = mtime
+            self.manifest = manifest
+            self.ntotal   = int(manifest["ntotal"])
+            if changed:
+                print(f"  Reloaded shard(s) {changed} from {self.manifest_path}")
+            return changed
+
+    def _call(self, shard, msg):
+        with shard.lock:
+            for attempt in (1, 2):
+                if not shard.proc.is_alive():
+                    shard.restart()
+                try:
+                    shard.conn.send(msg)
+                    answered = shard.conn.poll(self.timeout)
+                    if answered:
+                        return shard.conn.recv()
+                except (EOFError, OSError):
+                    # Worker died between the liveness check and the reply: retry once on a new one
+                    shard.restart()
+                    if attempt == 2:
+                        raise
+                    continue
+                shard.restart()
+                raise TimeoutError(f"Shard {shard.id} did not answer within {self.timeout}s")
+
+    def search(self, vecs, k):
+        self.refresh()
+        vecs = np.ascontiguousarray(vecs, dtype="float32")
+        # Scatter: send to every shard first so they all search in parallel.
+        # Each shard's lock is held from send to receive; the finally releases them all.
+        pending, all_scores, all_ids = [], [], []
+        try:
+            for shard in self.shards:
+                shard.lock.acquire()
+                try:
+                    if not shard.proc.is_alive():
+                        print(f"  Shard {shard.id} down - restarting.")
+                        shard.restart()
+                    shard.conn.send(("search", vecs, k))
+                except Exception as e:
+                    shard.lock.release()
+                    print(f"  Shard {shard.id} unreachable ({e!r}) - skipped.")
+                    continue
+                pending.append(shard)
+            # Gather
+            for shard in pending:
+                try:
+                    if shard.conn.poll(self.timeout):
+                        s, i = shard.conn.recv()
+                        all_scores.append(s)
+                        all_ids.append(i)
+                    else:
+                        print(f"  Shard {shard.id} timed out - skipped, restarting.")
+                        shard.restart()
+                except (EOFError, OSError):
+                    print(f"  Shard {shard.id} failed - skipped, restarting.")
+                    shard.restart()
+        finally:
+            for shard in pending:
+                shard.lock.release()
+        return merge_topk(all_scores, all_ids, len(vecs), k)
+
+    def health(self):
+        self.refresh()
+        out = []
+        for shard in self.shards:
+            t0 = time.perf_counter()
+            try:
+                _, n = self._call(shard, ("ping",))
+                out.append({"shard": shard.id, "alive": True, "ntotal": n,
+                            "ms": (time.perf_counter() - t0) * 1000})
+            except Exception as e:
+                out.append({"shard": shard.id, "alive": False, "error": repr(e)})
+        return out
+
+    def reload_shard(self, shard_id):
+        """Re-reads one shard file after build_shards(..., only=[shard_id]).
+        search() and health() call this via refresh() when the manifest changes."""
+        return self._call(self.shards[shard_id], ("reload",))
+
+    def close(self):
+        for shard in self.shards:
+            shard.stop()
+
+
+def merge_topk(all_scores, all_ids, n_queries, k):
+    """Merges per-shard (scores, ids) into a global top-k, padded with -1 like faiss."""
+    scores = np.full((n_queries, k), -np.inf, dtype="float32")
+    ids    = np.full((n_queries, k), -1, dtype="int64")
+    if not all_scores:
+        return scores, ids
+    cat_s = np.concatenate(all_scores, axis=1)
+    cat_i = np.concatenate(all_ids, axis=1)
+    take  = min(k, cat_s.shape[1])
+    order = np.argsort(-cat_s, axis=1, kind="stable")[:, :take]
+    scores[:, :take] = np.take_along_axis(cat_s, order, axis=1)
+    ids[:, :take]    = np.take_along_axis(cat_i, order, axis=1)
+    return scores, ids
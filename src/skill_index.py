@@ -0,0 +1,208 @@
+"""
+skill_index.py - Precomputed skill index for deterministic matched/missing skills.
+  - Taxonomy: job tags only (role keywords are job titles, not skills), each
+    mapped to one lowercase canonical term via skills.aliases.
+  - Matching: one Aho-Corasick automaton over the terms and their aliases,
+    word-boundary checked. Terms in skills.case_sensitive (e.g. "Go") only match
+    free text with that exact casing; tags always match.
+  - Storage: per-job skill sets as a packed bitset matrix (N jobs x S skills),
+    built once by clean_jobs.py and aligned with jobs_clean.json / the FAISS index.
+  - Query: the resume is scanned once, then intersected against all hit rows
+    with numpy bit operations.
+Config: skills.min_term_length, skills.stop_terms, skills.aliases, skills.case_sensitive
+"""
+import json
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from src.config import get_skills_config
+
+SKILL_BITS_PATH  = Path("data/jobs/job_skills.npy")
+SKILL_VOCAB_PATH = Path("data/jobs/skill_vocab.json")
+_cache = {}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _norm(term) -> str:
+    return " ".join(str(term).lower().split())
+
+
+class AhoCorasick:
+    """Multi-pattern matcher, lower-casing the text unless ignore_case is False.
+    Reports whole-word hits only."""
+
+    def __init__(self, patterns: list, ignore_case: bool = True):
+        self.patterns    = patterns
+        self.ignore_case = ignore_case
+        self._goto = [{}]
+        self._fail = [0]
+        self._out  = [[]]
+        for pid, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pid)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set:
+        """Returns the set of pattern ids found in text as whole words."""
+        text  = text.lower() if self.ignore_case else text
+        found = set()
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pid in self._out[state]:
+                if pid in found:
+                    continue
+                start = end - len(self.patterns[pid]) + 1
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(self.patterns[pid][0]):
+                    continue
+                if end + 1 < len(text) and _is_word_char(text[end + 1]) and _is_word_char(self.patterns[pid][-1]):
+                    continue
+                found.add(pid)
+        return found
+
+
+def canonical_term(term, cfg: dict = None) -> str:
+    """Lowercase canonical name of a skill term, following skills.aliases."""
+    cfg = get_skills_config() if cfg is None else cfg
+    aliases = {_norm(a): _norm(c) for a, c in cfg.get("aliases", {}).items()}
+    key = _norm(term)
+    return aliases.get(key, key)
+
+
+def build_taxonomy(jobs: list, cfg: dict = None) -> list:
+    """Returns the sorted canonical skill terms found in job tags."""
+    cfg   = get_skills_config() if cfg is None else cfg
+    min_len = int(cfg.get("min_term_length", 2))
+    stop    = {_norm(t) for t in cfg.get("stop_terms", [])}
+    terms = {canonical_term(t, cfg) for j in jobs for t in (j.get("tags") or [])}
+    return sorted(t for t in terms if len(t) >= min_len and t not in stop)
+
+
+def text_patterns(vocab: list, cfg: dict = None) -> dict:
+    """{"any": {pattern: term}, "exact": {pattern: term}} used to find vocab terms in
+    free text. Terms and aliases match case-insensitively, except the patterns listed
+    in skills.case_sensitive, which only match as written ("Go", not "go to market")."""
+    cfg = get_skills_config() if cfg is None else cfg
+    known = set(vocab)
+    exact = {str(p).strip(): canonical_term(p, cfg) for p in cfg.get("case_sensitive", [])}
+    exact = {p: t for p, t in exact.items() if t in known}
+    loose = {t: t for t in vocab}
+    loose.update((_norm(a), canonical_term(a, cfg)) for a in cfg.get("aliases", {}))
+    exact_keys = {_norm(p) for p in exact}
+    return {"any": {p: t for p, t in loose.items() if t in known and p not in exact_keys},
+            "exact": exact}
+
+
+class SkillIndex:
+    def __init__(self, vocab: list, bits: np.ndarray, patterns: dict = None):
+        self.vocab    = vocab
+        self.bits     = bits
+        self.patterns = patterns if patterns is not None else {"any": {_norm(t): t for t in vocab}, "exact": {}}
+        ids = {t: i for i, t in enumerate(vocab)}
+        self._matchers = []
+        for kind, table in (("any", self.patterns["any"]), ("exact", self.patterns.get("exact", {}))):
+            if table:
+                keys = list(table)
+                self._matchers.append((AhoCorasick(keys, ignore_case=kind == "any"),
+                                       [ids[table[k]] for k in keys]))
+
+    def find(self, text: str) -> set:
+        """Vocab ids of every skill mentioned in text."""
+        found = set()
+        for matcher, to_id in self._matchers:
+            found.update(to_id[pid] for pid in matcher.find(text or ""))
+        return found
+
+    def vector(self, text: str) -> np.ndarray:
+        """Boolean skill vector (S,) for a piece of text."""
+        vec = np.zeros(len(self.vocab), dtype=bool)
+        ids = list(self.find(text))
+        if ids:
+            vec[ids] = True
+        return vec
+
+    def job_rows(self, job_indices) -> np.ndarray:
+        return np.unpackbits(self.bits[np.asarray(job_indices, dtype=np.int64)],
+                             axis=1, count=len(self.vocab)).astype(bool)
+
+    def gaps(self, resume_text: str, job_indices) -> list:
+        """Returns [(matched, missing), ...] skill name lists, one per job index."""
+        if len(job_indices) == 0:
+            return []
+        resume  = self.vector(resume_text)
+        rows    = self.job_rows(job_indices)
+        matched = rows & resume
+        missing = rows & ~resume
+        return [([self.vocab[i] for i in np.flatnonzero(m)],
+                 [self.vocab[i] for i in np.flatnonzero(x)])
+                for m, x in zip(matched, missing)]
+
+
+def job_description(job: dict) -> str:
+    """The description part of clean_text. The Title/Company/Location header lines
+    are not scanned, so company names and places never become skills."""
+    return (job.get("clean_text") or "").split("Description:", 1)[-1]
+
+
+def build_skill_index(jobs: list, cfg: dict = None) -> SkillIndex:
+    """Extracts every job's skills (tags + description) into a packed bitset matrix."""
+    cfg   = get_skills_config() if cfg is None else cfg
+    vocab = build_taxonomy(jobs, cfg)
+    index = SkillIndex(vocab, np.zeros((0, 0), dtype=np.uint8), text_patterns(vocab, cfg))
+    lookup = {t: i for i, t in enumerate(vocab)}
+    dense = np.zeros((len(jobs), len(vocab)), dtype=bool)
+    for row, job in enumerate(jobs):
+        ids = index.find(job_description(job))
+        ids.update(lookup[k] for k in (canonical_term(t, cfg) for t in job.get("tags") or [])
+                   if k in lookup)
+        if ids:
+            dense[row, list(ids)] = True
+    index.bits = np.packbits(dense, axis=1)
+    return index
+
+
+def save_skill_index(index: SkillIndex, bits_path=SKILL_BITS_PATH, vocab_path=SKILL_VOCAB_PATH):
+    Path(bits_path).parent.mkdir(parents=True, exist_ok=True)
+    np.save(bits_path, index.bits)
+    Path(vocab_path).write_text(json.dumps({"skills": index.vocab, "patterns": index.patterns},
+                                           ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_skill_index(bits_path=SKILL_BITS_PATH, vocab_path=SKILL_VOCAB_PATH):
+    """Returns the cached SkillIndex, or None if clean_jobs.py has not built one yet."""
+    bits_path, vocab_path = Path(bits_path), Path(vocab_path)
+    if not bits_path.exists() or not vocab_path.exists():
+        return None
+    key = (str(bits_path), bits_path.stat().st_mtime_ns)
+    if key not in _cache:
+        _cache.clear()
+        data = json.loads(vocab_path.read_text(encoding="utf-8"))
+        if isinstance(data, list):
+            data = {"skills": data}   # built before aliases: plain term list
+        _cache[key] = SkillIndex(data["skills"], np.load(bits_path), data.get("patterns"))
+    return _cache[key]
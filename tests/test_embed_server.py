@@ -0,0 +1,42 @@
+import os
+import stat
+from multiprocessing import Pipe
+
+import numpy as np
+import pytest
+
+from src.embed_server import load_or_create_key, parse_address, recv_msg, send_msg
+
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:8765") == (("127.0.0.1", 8765), "AF_INET")
+    assert parse_address(":8765") == (("127.0.0.1", 8765), "AF_INET")
+    assert parse_address("data/run/embed.sock") == ("data/run/embed.sock", "AF_UNIX")
+
+
+def test_key_file_is_private_and_stable(tmp_path):
+    path = tmp_path / "run" / "embed.key"
+    key = load_or_create_key(path)
+    assert len(key) == 64
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert load_or_create_key(path) == key
+
+
+def test_framing_round_trip():
+    a, b = Pipe()
+    vecs = np.arange(12, dtype="float32").reshape(3, 4)
+    send_msg(a, {"status": "ok", "shape": list(vecs.shape)}, vecs.tobytes())
+    header, payload = recv_msg(b, timeout=1)
+    assert header["status"] == "ok" and header["payload"] is True
+    np.testing.assert_array_equal(np.frombuffer(payload, "float32").reshape(header["shape"]), vecs)
+    send_msg(a, {"op": "status"})
+    assert recv_msg(b, timeout=1) == ({"op": "status", "payload": False}, None)
+
+
+def test_recv_timeout_and_non_json_frame():
+    a, b = Pipe()
+    with pytest.raises(TimeoutError):
+        recv_msg(b, timeout=0.05)
+    a.send(("pickled", "tuple"))   # a pickle frame is rejected, never unpickled
+    with pytest.raises(ValueError):
+        recv_msg(b, timeout=1)
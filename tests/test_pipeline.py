@@ -0,0 +1,49 @@
+import time
+
+from src.pipeline import Stage, output_stats, stage_fingerprint, stale_reason
+
+
+def make_stage(tmp_path, **kwargs):
+    src = tmp_path / "in.txt"
+    out = tmp_path / "out.txt"
+    code = tmp_path / "stage.py"
+    if not src.exists():
+        src.write_text("a")
+        code.write_text("x = 1")
+    out.write_text("result")
+    return Stage("s", lambda: None, inputs=[src], outputs=[out], code=[code], **kwargs), src, out, code
+
+
+def record_for(stage):
+    parts, fp = stage_fingerprint(stage)
+    return {"fingerprint": fp, "parts": parts, "outputs": output_stats(stage),
+            "finished_at_ts": time.time()}
+
+
+def test_fresh_stage_is_not_stale(tmp_path):
+    stage, *_ = make_stage(tmp_path)
+    record = record_for(stage)
+    assert stale_reason(stage, record, *stage_fingerprint(stage)) is None
+    assert stale_reason(stage, None, *stage_fingerprint(stage)) == "never run"
+
+
+def test_input_code_and_output_changes_are_detected(tmp_path):
+    stage, src, out, code = make_stage(tmp_path)
+    record = record_for(stage)
+    src.write_text("b")
+    assert stale_reason(stage, record, *stage_fingerprint(stage)) == "inputs changed"
+    src.write_text("a")
+    code.write_text("x = 2")
+    assert stale_reason(stage, record, *stage_fingerprint(stage)) == "code changed"
+    code.write_text("x = 1")
+    out.write_text("edited by hand")
+    assert stale_reason(stage, record, *stage_fingerprint(stage)) == "outputs modified"
+    out.unlink()
+    assert stale_reason(stage, record, *stage_fingerprint(stage)) == f"missing {out}"
+
+
+def test_max_age(tmp_path):
+    stage, *_ = make_stage(tmp_path, max_age_hours=1)
+    record = record_for(stage)
+    record["finished_at_ts"] -= 2 * 3600
+    assert stale_reason(stage, record, *stage_fingerprint(stage)) == "older than 1h"
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from src.score_explain import parse_batch_output, plan_batches, score_top_jobs
+
+FIELDS = {"fit_score": "FIT_SCORE", "matched_skills": "MATCHED_SKILLS",
+          "missing_skills": "MISSING_SKILLS", "recommendations": "RECOMMENDATIONS",
+          "summary": "SUMMARY"}
+
+
+def block(n, score):
+    return (f"JOB {n}\nFIT_SCORE: {score}\nMATCHED_SKILLS: python\nMISSING_SKILLS: go\n"
+            f"RECOMMENDATIONS: learn go\nSUMMARY: Job {n} fit.")
+
+
+def test_parse_batch_output_all_blocks():
+    parsed = parse_batch_output("\n".join(block(n, 10 * n) for n in (1, 2, 3)), FIELDS, 3)
+    assert {n: r["fit_score"] for n, r in parsed.items()} == {1: 10, 2: 20, 3: 30}
+    assert parsed[2]["matched_skills"] == ["python"]
+
+
+def test_parse_batch_output_reordered_blocks_keep_their_numbers():
+    parsed = parse_batch_output("\n".join(block(n, 10 * n) for n in (3, 1, 2)), FIELDS, 3)
+    assert {n: r["fit_score"] for n, r in parsed.items()} == {1: 10, 2: 20, 3: 30}
+
+
+def test_parse_batch_output_drops_missing_incomplete_and_out_of_range_blocks():
+    raw = "\n".join([
+        block(1, 70),
+        "JOB 2\nFIT_SCORE: 55\nMATCHED_SKILLS: sql",   # cut off
+        "JOB 3\nFIT_SCORE: high\nMATCHED_SKILLS: a\nMISSING_SKILLS: b\nRECOMMENDATIONS: c\nSUMMARY: d.",
+        block(9, 90),
+    ])
+    assert list(parse_batch_output(raw, FIELDS, 4)) == [1]
+
+
+def test_plan_batches_respects_budget_and_max_jobs():
+    texts = ["x" * 400] * 5                      # 101 tokens each
+    # fixed 100 + per job 101 + 50 + 4 = 155 -> two jobs fit in 450
+    assert plan_batches(texts, 100, 50, 450, max_jobs=5) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(texts, 100, 50, 10_000, max_jobs=2) == [[0, 1], [2, 3], [4]]
+    # A job larger than the budget still gets its own batch
+    assert plan_batches(["x" * 8000], 100, 50, 450, max_jobs=5) == [[0]]
+
+
+class FakeClient:
+    """Answers batch prompts with blocks for `batch_jobs` only; single prompts with one result."""
+
+    def __init__(self, batch_jobs):
+        self.batch_jobs = batch_jobs
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        if "JOBS:" in prompt:
+            text = "\n".join(block(n, 10 * n) for n in self.batch_jobs)
+        else:
+            text = block(1, 99).split("\n", 1)[1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def test_missing_batch_block_falls_back_to_single_scoring():
+    jobs = [{"idx": i, "title": f"job {i}", "clean_text": f"Job text {i}"} for i in range(3)]
+    client = FakeClient(batch_jobs=[3, 1])         # JOB 2 missing, blocks out of order
+    scored = score_top_jobs("resume", jobs, client, top_n=3, batch=True, packed=False)
+    assert [j["fit_score"] for j in scored] == [10, 99, 30]
+    assert [j["idx"] for j in scored] == [0, 1, 2]
+    assert len(client.prompts) == 2               # one batch call + one single call for job 2
@@ -0,0 +1,44 @@
+import numpy as np
+import faiss
+
+from src.sharded_index import merge_topk, shard_rows
+
+
+def shard_search(vecs, queries, num_shards, k):
+    scores, ids = [], []
+    for shard_id in range(num_shards):
+        rows  = shard_rows(len(vecs), num_shards, shard_id)
+        index = faiss.IndexIDMap(faiss.IndexFlatIP(vecs.shape[1]))
+        index.add_with_ids(vecs[rows], rows)
+        s, i = index.search(queries, min(k, index.ntotal))
+        scores.append(s)
+        ids.append(i)
+    return scores, ids
+
+
+def test_merge_topk_matches_flat_index():
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((101, 16)).astype("float32")
+    faiss.normalize_L2(vecs)
+    queries = vecs[[0, 37, 99]].copy()
+    flat = faiss.IndexFlatIP(16)
+    flat.add(vecs)
+    for num_shards in (2, 3, 7):
+        for k in (1, 10, 50):
+            want_s, want_i = flat.search(queries, k)
+            got_s, got_i = merge_topk(*shard_search(vecs, queries, num_shards, k), len(queries), k)
+            np.testing.assert_array_equal(got_i, want_i)
+            np.testing.assert_allclose(got_s, want_s, rtol=1e-6)
+
+
+def test_merge_topk_pads_like_faiss_when_k_exceeds_ntotal():
+    vecs = np.eye(4, dtype="float32")
+    scores, ids = merge_topk(*shard_search(vecs, vecs[:1], 2, 6), 1, 6)
+    assert ids[0, 0] == 0 and sorted(ids[0, :4].tolist()) == [0, 1, 2, 3]
+    assert ids[0, 4:].tolist() == [-1, -1]
+    assert np.isneginf(scores[0, 4:]).all()
+
+
+def test_merge_topk_no_shards_answered():
+    scores, ids = merge_topk([], [], 2, 3)
+    assert (ids == -1).all() and np.isneginf(scores).all()
@@ -0,0 +1,38 @@
+import re
+
+from src.skill_index import AhoCorasick, build_skill_index
+
+CFG = {"min_term_length": 2, "stop_terms": ["startup"],
+       "aliases": {"golang": "go", "micro services": "microservices", "rest": "rest api"},
+       "case_sensitive": ["Go", "REST"]}
+
+
+def naive_find(patterns, text):
+    text = text.lower()
+    return {i for i, p in enumerate(patterns)
+            if re.search(rf"(?<!\w){re.escape(p)}(?!\w)" if p[0].isalnum() and p[-1].isalnum()
+                         else re.escape(p), text)}
+
+
+def test_aho_corasick_matches_whole_words_like_regex():
+    patterns = ["python", "java", "javascript", "c++", "sql", "postgresql", "ci/cd", "machine learning"]
+    matcher = AhoCorasick(patterns)
+    for text in ["Python, JavaScript and PostgreSQL", "java-based CI/CD; C++ and nosql",
+                 "pythonic machine learning", "Machine  Learning", "javascripts"]:
+        assert matcher.find(text) == naive_find(patterns, text), text
+
+
+def test_aho_corasick_case_sensitive():
+    assert AhoCorasick(["Go"], ignore_case=False).find("Go, Python") == {0}
+    assert AhoCorasick(["Go"], ignore_case=False).find("go to market") == set()
+
+
+def test_skill_index_aliases_and_case_rules():
+    jobs = [{"tags": ["Go", "Micro services", "startup"], "clean_text": "Title: X\nDescription: golang"},
+            {"tags": ["microservices", "REST"], "clean_text": "Company: Go Inc\nDescription: the rest of it"}]
+    index = build_skill_index(jobs, CFG)
+    assert index.vocab == ["go", "microservices", "rest api"]
+    resume = "Built REST services in Go; let's go to market"
+    assert index.gaps(resume, [0, 1]) == [(["go"], ["microservices"]),
+                                          (["rest api"], ["microservices"])]
+    assert index.gaps("golang and micro services", [0]) == [(["go", "microservices"], [])]